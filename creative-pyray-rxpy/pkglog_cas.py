@@ -0,0 +1,113 @@
+import gzip
+import hashlib
+import json
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+# zstd when available (stdlib on Python 3.14+, else the zstandard package), gzip otherwise
+try:
+    from compression import zstd
+
+    def _zstd_open(path: Path, mode: str):
+        return zstd.open(path, mode, level=19) if "w" in mode else zstd.open(path, mode)
+except ImportError:
+    try:
+        import zstandard as zstd
+
+        def _zstd_open(path: Path, mode: str):
+            return zstd.open(path, mode, cctx=zstd.ZstdCompressor(level=19)) if "w" in mode else zstd.open(path, mode)
+    except ImportError:
+        zstd = None
+
+# Inside the log directory each function is given (pkglog_store.log_dir)
+OBJECTS_DIR = "objects"
+MANIFEST_NAME = "manifest.jsonl"
+
+CHUNK_SIZE = 1 << 20
+_manifest_lock = threading.Lock()
+
+
+def _object_path(log_dir: Path, digest: str, suffix: str) -> Path:
+    return log_dir / OBJECTS_DIR / digest[:2] / f"{digest}{suffix}"
+
+
+def _hash_file(path: Path) -> Tuple[str, int]:
+    h = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            h.update(chunk)
+            size += len(chunk)
+    return h.hexdigest(), size
+
+
+def find_object(log_dir: Path, digest: str) -> Optional[Path]:
+    """Stored body for `digest` under `log_dir`, whichever codec wrote it."""
+    for suffix in (".zst", ".gz"):
+        path = _object_path(log_dir, digest, suffix)
+        if path.exists():
+            return path
+    return None
+
+
+def _compress(src: Path, dest: Path) -> None:
+    tmp = dest.with_suffix(dest.suffix + ".tmp")
+    opener = _zstd_open if dest.suffix == ".zst" else gzip.open
+    with open(src, "rb") as fin, opener(tmp, "wb") as fout:
+        shutil.copyfileobj(fin, fout, CHUNK_SIZE)
+    tmp.replace(dest)
+
+
+def store_file(log_dir: Path, path: Path, manager: str, taken_at: str) -> Tuple[str, bool]:
+    """
+    Store a snapshot body content-addressed and record it in the manifest.
+
+    The body is hashed first; it is only compressed and written when no object
+    with that hash exists yet, so an unchanged listing costs one manifest line.
+
+    Args:
+        log_dir: Directory holding the objects and the manifest
+        path: Uncompressed snapshot file (left in place)
+        manager: Package manager name
+        taken_at: Snapshot timestamp in YYYYMMDD_HHMMSS format
+
+    Returns:
+        (sha256 hex digest, True if a new object was written)
+    """
+    digest, size = _hash_file(path)
+    written = False
+    if find_object(log_dir, digest) is None:
+        dest = _object_path(log_dir, digest, ".zst" if zstd is not None else ".gz")
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        _compress(path, dest)
+        written = True
+
+    entry = {"taken_at": taken_at, "manager": manager, "sha256": digest, "size": size}
+    with _manifest_lock, open(log_dir / MANIFEST_NAME, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+    return digest, written
+
+
+def read_body(log_dir: Path, digest: str) -> str:
+    """Decompressed snapshot text for `digest` stored under `log_dir`."""
+    path = find_object(log_dir, digest)
+    if path is None:
+        raise FileNotFoundError(f"no stored object for {digest}")
+    if path.suffix == ".zst" and zstd is None:
+        raise RuntimeError("zstd-compressed snapshot needs Python 3.14+ or the zstandard package")
+    opener = _zstd_open if path.suffix == ".zst" else gzip.open
+    with opener(path, "rb") as f:
+        return f.read().decode(errors="replace")
+
+
+def iter_manifest(log_dir: Path) -> Iterator[Dict[str, object]]:
+    """Manifest entries under `log_dir` in the order snapshots were taken."""
+    manifest_path = log_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return
+    with open(manifest_path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,345 @@
+import hashlib
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import pkglog_cas
+
+# Where system_pkglogs.py writes its snapshots, the pkglog_cas objects and
+# manifest, and this database
+log_dir = Path.home() / "package-logs"
+db_path = log_dir / "packages.sqlite3"
+
+# <manager>-YYYYMMDD_HHMMSS.txt
+LOG_NAME = re.compile(r"^(?P<manager>[a-z]+)-(?P<ts>\d{8}_\d{6})\.txt$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS packages (
+    id      INTEGER PRIMARY KEY,
+    manager TEXT NOT NULL,
+    name    TEXT NOT NULL,
+    version TEXT NOT NULL,
+    UNIQUE (manager, name, version)
+);
+-- One row per distinct listing, keyed by the sha256 of its raw text (the
+-- pkglog_cas object id); snapshots of an unchanged listing share it
+CREATE TABLE IF NOT EXISTS package_sets (
+    id      INTEGER PRIMARY KEY,
+    manager TEXT NOT NULL,
+    digest  TEXT NOT NULL,
+    UNIQUE (manager, digest)
+);
+CREATE TABLE IF NOT EXISTS package_set_members (
+    set_id     INTEGER NOT NULL REFERENCES package_sets(id),
+    package_id INTEGER NOT NULL REFERENCES packages(id),
+    PRIMARY KEY (set_id, package_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots (
+    id       INTEGER PRIMARY KEY,
+    manager  TEXT NOT NULL,
+    taken_at TEXT NOT NULL,
+    set_id   INTEGER NOT NULL REFERENCES package_sets(id),
+    UNIQUE (manager, taken_at)
+);
+"""
+
+Row = Tuple[str, str]  # (name, version)
+
+
+def parse_apt(text: str) -> Iterator[Row]:
+    # name/suite,now 1.2.3-1 amd64 [installed,automatic]
+    for line in text.splitlines():
+        if "/" not in line or line.startswith("Listing"):
+            continue
+        name, _, rest = line.partition("/")
+        fields = rest.split()
+        if len(fields) >= 2:
+            yield name, fields[1]
+
+
+def parse_brew(text: str) -> Iterator[Row]:
+    # name 1.2.3 [1.2.2 ...]
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) >= 2:
+            yield fields[0], " ".join(fields[1:])
+
+
+def parse_snap(text: str) -> Iterator[Row]:
+    # Name  Version  Rev  Tracking  Publisher  Notes
+    for line in text.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) >= 2:
+            yield fields[0], fields[1]
+
+
+def parse_flatpak(text: str) -> Iterator[Row]:
+    # application<TAB>version (version may be empty)
+    for line in text.splitlines():
+        name, _, version = line.partition("\t")
+        if name.strip():
+            yield name.strip(), version.strip()
+
+
+def parse_nix(text: str) -> Iterator[Row]:
+    # Newer: "Name: hello" ... "Store paths: /nix/store/<hash>-hello-2.12.1"
+    # Older: "0 flake:nixpkgs#...hello ... /nix/store/<hash>-hello-2.12.1"
+    store_path = re.compile(r"/nix/store/[a-z0-9]{32}-(?P<name>.+?)-(?P<version>\d[^\s/]*)")
+    for match in store_path.finditer(text):
+        yield match.group("name"), match.group("version")
+
+
+def parse_cargo(text: str) -> Iterator[Row]:
+    # ripgrep v13.0.0:
+    #     rg
+    for line in text.splitlines():
+        if line and not line[0].isspace() and line.endswith(":"):
+            fields = line[:-1].split()
+            if len(fields) >= 2:
+                yield fields[0], fields[1].lstrip("v")
+
+
+PARSERS: Dict[str, Callable[[str], Iterable[Row]]] = {
+    "apt": parse_apt,
+    "brew": parse_brew,
+    "snap": parse_snap,
+    "flatpak": parse_flatpak,
+    "nix": parse_nix,
+    "cargo": parse_cargo,
+}
+
+
+def connect(path: Path = db_path) -> sqlite3.Connection:
+    """
+    Open (and create if needed) the snapshot database.
+
+    Args:
+        path: SQLite file location
+    """
+    path.parent.mkdir(exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def package_set(conn: sqlite3.Connection, manager: str, digest: str) -> Tuple[int, bool]:
+    """
+    Id of the package set for (manager, digest), and whether it was just created.
+    """
+    row = conn.execute(
+        "SELECT id FROM package_sets WHERE manager = ? AND digest = ?", (manager, digest)
+    ).fetchone()
+    if row is not None:
+        return row[0], False
+    cur = conn.execute("INSERT INTO package_sets (manager, digest) VALUES (?, ?)", (manager, digest))
+    return cur.lastrowid, True
+
+
+def add_snapshot(conn: sqlite3.Connection, manager: str, taken_at: str, text: str,
+                 digest: Optional[str] = None) -> Optional[int]:
+    """
+    Normalize one manager's listing into (manager, name, version) rows and record it.
+
+    Listings are stored once per content digest as a package set, and package
+    rows are shared between sets, so a snapshot whose listing is unchanged
+    costs a single snapshots row. Returns the snapshot id, or None if this
+    (manager, timestamp) pair was already stored or the manager is unknown.
+
+    Args:
+        conn: Database connection from connect()
+        manager: Package manager name, a key of PARSERS
+        taken_at: Snapshot timestamp in YYYYMMDD_HHMMSS format
+        text: Raw output of the manager's list command
+        digest: sha256 of the raw listing, e.g. from pkglog_cas.store_file;
+            computed from `text` if not given
+    """
+    parser = PARSERS.get(manager)
+    if parser is None:
+        return None
+    if digest is None:
+        digest = hashlib.sha256(text.encode()).hexdigest()
+
+    with conn:
+        exists = conn.execute(
+            "SELECT 1 FROM snapshots WHERE manager = ? AND taken_at = ?", (manager, taken_at)
+        ).fetchone()
+        if exists:
+            return None
+
+        set_id, created = package_set(conn, manager, digest)
+        if created:
+            rows = set(parser(text))
+            conn.executemany(
+                "INSERT OR IGNORE INTO packages (manager, name, version) VALUES (?, ?, ?)",
+                ((manager, name, version) for name, version in rows),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO package_set_members (set_id, package_id) "
+                "SELECT ?, id FROM packages WHERE manager = ? AND name = ? AND version = ?",
+                ((set_id, manager, name, version) for name, version in rows),
+            )
+        cur = conn.execute(
+            "INSERT INTO snapshots (manager, taken_at, set_id) VALUES (?, ?, ?)",
+            (manager, taken_at, set_id),
+        )
+    return cur.lastrowid
+
+
+def import_logs(conn: sqlite3.Connection, directory: Path = log_dir) -> int:
+    """
+    Ingest every <manager>-<timestamp>.txt snapshot not yet in the database.
+
+    Args:
+        conn: Database connection from connect()
+        directory: Folder holding the text snapshots
+    """
+    imported = 0
+    for path in sorted(directory.glob("*-*.txt")):
+        match = LOG_NAME.match(path.name)
+        if not match:
+            continue
+        text = path.read_text(errors="replace")
+        if add_snapshot(conn, match["manager"], match["ts"], text) is not None:
+            imported += 1
+    return imported
+
+
+def import_manifest(conn: sqlite3.Connection, directory: Path = log_dir) -> int:
+    """
+    Ingest content-addressed snapshots listed in the pkglog_cas manifest.
+
+    Args:
+        conn: Database connection from connect()
+        directory: Folder holding the manifest and objects
+    """
+    imported = 0
+    for entry in pkglog_cas.iter_manifest(directory):
+        manager, taken_at = entry["manager"], entry["taken_at"]
+        exists = conn.execute(
+            "SELECT 1 FROM snapshots WHERE manager = ? AND taken_at = ?", (manager, taken_at)
+        ).fetchone()
+        if exists or manager not in PARSERS:
+            continue
+        body = pkglog_cas.read_body(directory, entry["sha256"])
+        if add_snapshot(conn, manager, taken_at, body, entry["sha256"]) is not None:
+            imported += 1
+    return imported
+
+
+def snapshot_at(conn: sqlite3.Connection, manager: str, taken_at: str) -> Optional[int]:
+    """Latest snapshot of `manager` taken at or before `taken_at`."""
+    row = conn.execute(
+        "SELECT id FROM snapshots WHERE manager = ? AND taken_at <= ? "
+        "ORDER BY taken_at DESC LIMIT 1",
+        (manager, taken_at),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def diff(conn: sqlite3.Connection, manager: str, t1: str, t2: str) -> Dict[str, List[tuple]]:
+    """
+    What changed for `manager` between times t1 and t2.
+
+    Both sides are set operations over the indexed package_set_members table.
+
+    Args:
+        conn: Database connection from connect()
+        manager: Package manager name
+        t1: Earlier timestamp (YYYYMMDD_HHMMSS, or any prefix such as YYYYMMDD)
+        t2: Later timestamp
+
+    Returns:
+        {"added": [(name, version)], "removed": [(name, version)],
+         "changed": [(name, old_version, new_version)]}
+
+    Raises:
+        LookupError: `manager` has no snapshot taken at or before t1 or t2
+    """
+    # Pad prefixes so "20250101" means the end of that day ("~" sorts after digits and "_")
+    a = snapshot_at(conn, manager, t1.ljust(15, "~"))
+    b = snapshot_at(conn, manager, t2.ljust(15, "~"))
+    for snapshot, t in ((a, t1), (b, t2)):
+        if snapshot is None:
+            raise LookupError(f"no {manager} snapshot taken at or before {t}")
+
+    set_a, set_b = (
+        conn.execute("SELECT set_id FROM snapshots WHERE id = ?", (snapshot,)).fetchone()[0]
+        for snapshot in (a, b)
+    )
+    if set_a == set_b:
+        return {"added": [], "removed": [], "changed": []}
+
+    only = """
+        SELECT p.name, p.version FROM packages p WHERE p.id IN (
+            SELECT package_id FROM package_set_members WHERE set_id = ?
+            EXCEPT
+            SELECT package_id FROM package_set_members WHERE set_id = ?
+        ) ORDER BY p.name
+    """
+    gone = conn.execute(only, (set_a, set_b)).fetchall()
+    new = conn.execute(only, (set_b, set_a)).fetchall()
+
+    old_versions = dict(gone)
+    new_versions = dict(new)
+    changed = [
+        (name, old_versions[name], version)
+        for name, version in new
+        if name in old_versions
+    ]
+    return {
+        "added": [(n, v) for n, v in new if n not in old_versions],
+        "removed": [(n, v) for n, v in gone if n not in new_versions],
+        "changed": changed,
+    }
+
+
+def main(argv: List[str]) -> None:
+    usage = (
+        "usage: pkglog_store.py import\n"
+        "       pkglog_store.py diff T1 T2 [manager ...]\n"
+        "       pkglog_store.py list"
+    )
+    if not argv:
+        print(usage)
+        sys.exit(1)
+
+    conn = connect()
+    command = argv[0]
+
+    if command == "import":
+        count = import_logs(conn) + import_manifest(conn)
+        print(f"📥 Imported {count} snapshots into {db_path}")
+    elif command == "list":
+        for manager, taken_at, size in conn.execute(
+            "SELECT s.manager, s.taken_at, COUNT(m.package_id) FROM snapshots s "
+            "LEFT JOIN package_set_members m ON m.set_id = s.set_id "
+            "GROUP BY s.id ORDER BY s.taken_at, s.manager"
+        ):
+            print(f"{taken_at}  {manager:<8} {size} packages")
+    elif command == "diff" and len(argv) >= 3:
+        managers = argv[3:] or [
+            row[0] for row in conn.execute("SELECT DISTINCT manager FROM snapshots ORDER BY manager")
+        ]
+        for manager in managers:
+            try:
+                changes = diff(conn, manager, argv[1], argv[2])
+            except LookupError as e:
+                print(f"⚠️  {e}")
+                continue
+            if not any(changes.values()):
+                continue
+            print(f"📦 {manager}")
+            for name, version in changes["added"]:
+                print(f"  + {name} {version}")
+            for name, version in changes["removed"]:
+                print(f"  - {name} {version}")
+            for name, old, new in changes["changed"]:
+                print(f"  ~ {name} {old} -> {new}")
+    else:
+        print(usage)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -2,11 +2,14 @@ import os
 import subprocess
 import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
+import pkglog_cas
+import pkglog_store
 
-# Define log directory in user's home directory
-log_dir = Path.home() / "package-logs"
+# Log directory in user's home directory, shared with pkglog_store and pkglog_cas
+log_dir = pkglog_store.log_dir
 
 # Create timestamp in format YYYYMMDD_HHMMSS
 timestamp = time.strftime("%Y%m%d_%H%M%S")
@@ -14,16 +17,26 @@ timestamp = time.strftime("%Y%m%d_%H%M%S")
 # Ensure log directory exists
 log_dir.mkdir(exist_ok=True)
 
+# Indexed store of every snapshot, queried with `pkglog_store.py diff`
+store = pkglog_store.connect(pkglog_store.db_path)
 
-def log_packages(manager: str, cmd: str) -> None:
+
+def log_packages(manager: str, cmd: str, timeout: float) -> Optional[Path]:
     """
-    Log installed packages for a given package manager to a file.
+    Capture installed packages for a given package manager into a temporary file.
+
+    The command's output is streamed straight into the file rather than
+    captured in memory first; the caller moves it into the snapshot store.
 
     Args:
         manager: Name of the package manager
         cmd: Command to list installed packages
+        timeout: Seconds before the command is killed
+
+    Returns:
+        Path of the captured listing, or None if the manager was skipped or failed
     """
-    log_file = log_dir / f"{manager}-{timestamp}.txt"
+    log_file = log_dir / f".{manager}-{timestamp}.tmp"
     print(f"📦 Logging {manager} packages...")
 
     # Split command into executable and arguments
@@ -31,16 +44,22 @@ def log_packages(manager: str, cmd: str) -> None:
     executable = args[0]
 
     # Check if executable exists
-    if shutil.which(executable):
-        try:
-            # Run command and capture output
-            output = subprocess.check_output(args, stderr=subprocess.STDOUT, text=True)
-            log_file.write_text(output)
-            print(f"✅ Saved to {log_file}")
-        except subprocess.CalledProcessError as e:
-            print(f"⚠️  Error running {manager}: {e}")
-    else:
+    if not shutil.which(executable):
         print(f"⚠️  {manager} not found, skipping.")
+        return None
+
+    try:
+        with open(log_file, "w") as out:
+            subprocess.run(args, stdout=out, stderr=subprocess.STDOUT, timeout=timeout, check=True)
+    except subprocess.CalledProcessError as e:
+        print(f"⚠️  Error running {manager}: {e}")
+    except subprocess.TimeoutExpired:
+        print(f"⚠️  {manager} timed out after {timeout:.0f}s")
+    else:
+        return log_file
+
+    log_file.unlink(missing_ok=True)
+    return None
 
 
 # Define package managers and their commands
@@ -53,8 +72,31 @@ pkg_managers: Dict[str, str] = {
     "cargo": "cargo install --list",
 }
 
-# Log packages for each manager
-for manager, cmd in pkg_managers.items():
-    log_packages(manager, cmd)
+# Per-manager timeouts in seconds
+default_timeout = 60.0
+timeouts: Dict[str, float] = {
+    "apt": 120.0,
+    "nix": 120.0,
+}
+
+# Log packages for all managers concurrently; wall time is the slowest one
+with ThreadPoolExecutor(max_workers=len(pkg_managers)) as pool:
+    futures = {
+        pool.submit(log_packages, manager, cmd, timeouts.get(manager, default_timeout)): manager
+        for manager, cmd in pkg_managers.items()
+    }
+    for future in as_completed(futures):
+        manager = futures[future]
+        log_file = future.result()
+        if log_file is None:
+            continue
+        # Compressed, content-addressed body; identical listings are stored once
+        digest, written = pkglog_cas.store_file(log_dir, log_file, manager, timestamp)
+        # SQLite connection stays on this thread; the digest keys the package set
+        pkglog_store.add_snapshot(store, manager, timestamp, log_file.read_text(errors="replace"), digest)
+        log_file.unlink()
+        state = "saved" if written else "unchanged, reused"
+        print(f"✅ {manager}: {state} {digest[:12]}")
 
+store.close()
 print(f"\n📁 All logs saved in: {log_dir}")
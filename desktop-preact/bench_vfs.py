@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the VFS file handler: replays a page load.
+
+The request sequence is what the embedded browser asks for when the window
+opens: "/" (index redirect), index.html, every script/stylesheet/icon it
+references, then every chunk those scripts import, followed by requests the
+VFS does not own (webui.js) and a few misses.
+
+By default it runs against ./frontend/dist; pass --synthetic N to generate
+a Vite-like dist with N hashed chunks instead (no bun/node needed):
+
+  python3 bench_vfs.py                      # real build
+  python3 bench_vfs.py --synthetic 500 --repeat 200
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from typing import List
+
+import vfs
+import vfs_metrics
+import vfs_pack
+
+# Anything that looks like a same-origin asset URL in HTML, JS or CSS
+ASSET_REF = re.compile(r"""(?:src|href)=["'](/[^"']+)["']|["']((?:\.{1,2}/|/?assets/)[^"']+\.(?:js|css|svg|png|woff2?))["']""")
+# Requests served by webui itself or simply missing
+EXTRA_REQUESTS = ["/webui.js", "/favicon.ico", "/missing/chunk.js"]
+
+
+def make_synthetic_dist(directory: str, chunks: int, seed: int = 0) -> None:
+    """Write a Vite-shaped dist tree: index.html, hashed JS/CSS chunks, maps, media and manifest."""
+    rng = random.Random(seed)
+    assets = os.path.join(directory, "assets")
+    os.makedirs(assets, exist_ok=True)
+
+    def hashed(stem: str, ext: str) -> str:
+        return f"{stem}-{rng.getrandbits(32):08x}{ext}"
+
+    names = [hashed(f"chunk{i}", ".js") for i in range(chunks)]
+    for i, name in enumerate(names):
+        imports = rng.sample(names[i + 1:], min(3, len(names) - i - 1))
+        body = "".join(f'import"./{dep}";' for dep in imports)
+        body += "export const x=" + "1+" * rng.randint(200, 20000) + "1;\n"
+        with open(os.path.join(assets, name), "w") as f:
+            f.write(body)
+        with open(os.path.join(assets, name + ".map"), "w") as f:
+            f.write('{"version":3,"mappings":"' + "A" * len(body) * 3 + '"}')
+
+    entry, css = hashed("index", ".js"), hashed("index", ".css")
+    with open(os.path.join(assets, entry), "w") as f:
+        f.write("".join(f'import"./{dep}";' for dep in names[:10]))
+    with open(os.path.join(assets, css), "w") as f:
+        f.write("body{margin:0}" * 2000)
+    with open(os.path.join(assets, "logo.png"), "wb") as f:
+        f.write(os.urandom(200_000))
+    with open(os.path.join(directory, "vite.svg"), "w") as f:
+        f.write("<svg xmlns='http://www.w3.org/2000/svg'/>")
+    manifest = {f"src/chunk{i}.js": {"file": f"assets/{name}"} for i, name in enumerate(names)}
+    manifest["index.html"] = {"file": f"assets/{entry}", "css": [f"assets/{css}"], "isEntry": True}
+    os.makedirs(os.path.join(directory, ".vite"), exist_ok=True)
+    with open(os.path.join(directory, ".vite", "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+    with open(os.path.join(directory, "index.html"), "w") as f:
+        f.write(
+            "<!doctype html><html><head>"
+            '<link rel="icon" type="image/svg+xml" href="/vite.svg" />'
+            f'<script type="module" crossorigin src="/assets/{entry}"></script>'
+            f'<link rel="stylesheet" crossorigin href="/assets/{css}">'
+            '<script src="/webui.js"></script>'
+            '</head><body><div id="app"></div><img src="/assets/logo.png"></body></html>'
+        )
+
+
+def page_load_requests(directory: str) -> List[str]:
+    """Request paths in the order a browser would issue them for a cold load."""
+    requests = ["/", "/index.html"]
+    seen = set(requests)
+    queue = ["/index.html"]
+    while queue:
+        current = queue.pop(0)
+        full = os.path.join(directory, current.lstrip("/"))
+        if not os.path.isfile(full) or not current.endswith((".html", ".js", ".css")):
+            continue
+        with open(full, encoding="utf-8", errors="replace") as f:
+            text = f.read()
+        base = os.path.dirname(current)
+        for match in ASSET_REF.finditer(text):
+            ref = match.group(1) or match.group(2)
+            if ref.startswith("assets/"):
+                ref = "/" + ref  # Vite's preload map is relative to the root
+            elif not ref.startswith("/"):
+                ref = os.path.normpath(os.path.join(base, ref))
+            if ref not in seen:
+                seen.add(ref)
+                requests.append(ref)
+                queue.append(ref)
+    return requests + EXTRA_REQUESTS
+
+
+def linear_vfs(path: str, files: list, index_pairs: list):
+    """The pre-index handler: list scan for files, pairwise scan for index redirects."""
+    for vf in files:
+        if vf.path == path:
+            return vf
+    redirect_path = path if path.endswith("/") else path + "/"
+    for i in range(0, len(index_pairs), 2):
+        if index_pairs[i] == redirect_path:
+            return index_pairs[i + 1]
+    return None
+
+
+def warm_reload_bytes(requests: List[str]) -> int:
+    """
+    Bytes the VFS returns for a reload once the browser cache holds the page,
+    with If-None-Match passed through the headers API. webui does not pass
+    request headers, so in the app every non-immutable file is sent in full.
+    """
+    total = 0
+    for path in requests:
+        first = vfs.vfs_bytes(path)
+        if first is None:
+            continue
+        first = bytes(first)  # memoryview when served from a pack
+        head = first[:first.index(b"\r\n\r\n")].decode("latin-1")
+        if "immutable" in head:
+            continue
+        etag = next((line[6:] for line in head.split("\r\n") if line.startswith("ETag: ")), None)
+        revalidated = vfs.vfs_bytes(path, {"if-none-match": etag} if etag else None)
+        total += len(revalidated)
+    return total
+
+
+def timed_replay(handler, requests: List[str], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for path in requests:
+            handler(path)
+    return (time.perf_counter() - start) / repeat
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Replay a page load against the VFS handler")
+    parser.add_argument("--dist", default="./frontend/dist", help="built frontend directory")
+    parser.add_argument("--synthetic", type=int, metavar="CHUNKS",
+                        help="generate a dist with this many hashed chunks instead")
+    parser.add_argument("--repeat", type=int, default=100, help="page loads to replay")
+    parser.add_argument("--lazy", action="store_true", help="load files on first request")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write and serve .gz/.br variants of text assets")
+    parser.add_argument("--pack", action="store_true",
+                        help="serve from a packed bundle (vfs_pack.py) instead of the directory")
+    parser.add_argument("--resident", type=int, default=vfs.MAX_RESIDENT,
+                        help="files kept loaded in lazy mode")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="bench-vfs-") as tmpdir:
+        directory = args.dist
+        if args.synthetic:
+            directory = tmpdir
+            make_synthetic_dist(directory, args.synthetic)
+        if not os.path.isdir(directory):
+            print(f"{directory} not found; run `bun run build` in frontend/ or use --synthetic")
+            return 1
+
+        if args.pack:
+            pack_path = os.path.join(tmpdir, "bench.vfspack")
+            vfs_pack.write_pack(directory, pack_path, precompress=args.precompress)
+            start = time.perf_counter()
+            vfs_pack.load_pack(pack_path)
+        else:
+            if args.precompress:
+                vfs.precompress_tree(directory)  # a build step, not part of startup
+            start = time.perf_counter()
+            vfs.build_vfs(directory, lazy=args.lazy, resident=args.resident)
+        build_time = time.perf_counter() - start
+        requests = page_load_requests(directory)
+
+        files = list(vfs.virtual_files.values())
+        index_pairs = [x for pair in vfs.index_files.items() for x in pair]
+
+        first = timed_replay(vfs.vfs_bytes, requests, 1)
+        baseline = timed_replay(lambda p: linear_vfs(p, files, index_pairs), requests, args.repeat)
+        lookup = timed_replay(vfs.virtual_file_system, requests, args.repeat)
+        handler = timed_replay(vfs.vfs_bytes, requests, args.repeat)
+        str_handler = timed_replay(vfs.vfs, requests, args.repeat)
+        instrumented = timed_replay(vfs_metrics.instrument(vfs.vfs_bytes, trace=False),
+                                    requests, args.repeat)
+        identity = {"accept-encoding": "identity"}
+        sent = sum(len(vfs.vfs_bytes(p) or b"") for p in requests)
+        sent_identity = sum(len(vfs.vfs_bytes(p, identity) or b"") for p in requests)
+        warm = warm_reload_bytes(requests)
+
+    print(f"dist: {len(files)} files, {sum(f.size for f in files) / 1e6:.1f} MB, "
+          f"{'load_pack' if args.pack else 'build_vfs'}{' (lazy)' if args.lazy and not args.pack else ''} "
+          f"{build_time * 1000:.1f} ms")
+    print(f"page load: {len(requests)} requests, {args.repeat} replays")
+    print(f"  first page load      {first * 1e6:10.1f} us/page")
+    print(f"  linear scan lookup   {baseline * 1e6:10.1f} us/page")
+    print(f"  indexed lookup       {lookup * 1e6:10.1f} us/page")
+    print(f"  vfs_bytes() handler  {handler * 1e6:10.1f} us/page")
+    print(f"  vfs() str handler    {str_handler * 1e6:10.1f} us/page (latin-1 decode per hit)")
+    print(f"  instrumented handler {instrumented * 1e6:10.1f} us/page (vfs_metrics overhead)")
+    print(f"  response bytes       {sent / 1e6:10.2f} MB/page "
+          f"({sent_identity / max(sent, 1):.1f}x smaller than identity)")
+    print(f"  warm reload          {warm / 1e3:10.2f} kB/page (headers API only: immutable "
+          f"assets from cache, others 304 by ETag)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
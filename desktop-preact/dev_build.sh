@@ -5,10 +5,18 @@ cd frontend
 echo "building frontend ..."
 bun run build 
 
+# .gz/.br variants are made here, once per build, never at app startup
+(cd .. && uv run vfs.py frontend/dist)
+
+if [[ "${1:-}" == "--watch" ]]; then
+    # Rebuild on source changes; main.py --watch picks up the new files
+    bun run build --watch &
+    VITE_PID=$!
+    trap 'kill $VITE_PID' EXIT
+fi
+
 cd ..
 echo "run aplication .."
-uv run main.py 
+uv run main.py "$@"
 
 echo "exit .."
-
-
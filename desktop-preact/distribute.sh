@@ -0,0 +1,16 @@
+#!/usr/bin/bash
+set -euo pipefail
+
+cd "$(dirname "$0")"
+
+echo "building frontend ..."
+(cd frontend && bun run build)
+
+# One file holding every prebuilt response (see vfs_pack.py); the frozen
+# main.py serves from it instead of frontend/dist
+echo "packing frontend ..."
+mkdir -p build
+python3 vfs_pack.py frontend/dist build/frontend.vfspack
+
+echo "building executable ..."
+../make_executable.sh main.py --add-data "$(pwd)/build/frontend.vfspack:."
@@ -4,4 +4,7 @@ import preact from '@preact/preset-vite'
 // https://vite.dev/config/
 export default defineConfig({
   plugins: [preact()],
+  // dist/.vite/manifest.json lists the content-hashed files the VFS may
+  // serve as immutable
+  build: { manifest: true },
 })
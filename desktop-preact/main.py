@@ -1,122 +1,13 @@
+import argparse
 import os
-import mimetypes
-from typing import Optional
-from dataclasses import dataclass
-from webui import webui
+import sys
 
+from webui import webui
 
-@dataclass
-class VirtualFile:
-    path: str
-    body: str
-
-
-virtual_files: list[VirtualFile] = []
-# flat list: [dir_key, index_path, dir_key, index_path, ...]
-index_files: list[str] = []
-
-
-def build_vfs(directory: str):
-    """
-    Scan a directory tree and populate the global virtual file lists.
-
-    Walks through every file under `directory`, reads its contents as raw bytes
-    (decoded via Latin-1 to preserve 1:1 byte -> character mapping), and appends
-    a `VirtualFile(path, body)` entry to `virtual_files`. Detects any files
-    named `index.*`, recording them in `index_files`.
-
-    Args:
-        directory: The root directory whose files will be loaded into memory.
-
-    Globals:
-        virtual_files: Cleared and then extended with VirtualFile instances
-                       for each file found.
-        index_files:   Cleared and then populated with flat [dir_key, index_path]
-                       pairs corresponding to each directory's index file.
-    """
-    global virtual_files, index_files
-    virtual_files.clear()
-    index_files.clear()
-
-    index_map: dict[str,str] = {}
-
-    for root, _, filenames in os.walk(directory):
-        rel_dir = os.path.relpath(root, directory).replace('\\','/')
-        if rel_dir == '.':
-            rel_dir = ''
-
-        for fn in filenames:
-            full = os.path.join(root, fn)
-            vpath = f"/{rel_dir}/{fn}".replace('//','/')
-
-            # read raw bytes
-            with open(full, 'rb') as f:
-                body = f.read().decode('latin-1')
-
-            virtual_files.append(VirtualFile(path=vpath, body=body))
-
-            if fn.startswith("index."):
-                dir_key = f"/{rel_dir}/".replace('//','/')
-                if dir_key not in index_map:
-                    index_map[dir_key] = vpath
-
-    # flatten map into list
-    for dk, ip in index_map.items():
-        index_files.extend([dk, ip])
-
-
-def virtual_file_system(path: str) -> Optional[VirtualFile]:
-    """
-    Returns the matching VirtualFile or None.
-    """
-    global virtual_files
-
-    for vf in virtual_files:
-        if vf.path == path:
-            return vf
-    return None
-
-
-def vfs(path: str) -> Optional[str]:
-    """
-    Handler function for set_file_handler(),
-    Type needed: Callable[[str], Optional[str]]
-    - If exact file found, return "200 OK" headers + body.
-    - Else, check index_files for a 302 redirect.
-    - Else, return None.
-    """
-    global index_files
-
-    # Try exact file
-    vf = virtual_file_system(path)
-    if vf is not None:
-        length = len(vf.body)  # latin-1 str length == byte length
-        ctype = mimetypes.guess_type(path)[0] or "application/octet-stream"
-        header = (
-            "HTTP/1.1 200 OK\r\n"
-            f"Content-Type: {ctype}\r\n"
-            f"Content-Length: {length}\r\n"
-            "Cache-Control: no-cache\r\n\r\n"
-        )
-        return header + vf.body
-
-    # Not found; check for index redirect
-    redirect_path = path
-    if not redirect_path.endswith('/'):
-        redirect_path += '/'
-
-    for i in range(0, len(index_files), 2):
-        if index_files[i] == redirect_path:
-            location = index_files[i+1]
-            header = (
-                "HTTP/1.1 302 Found\r\n"
-                f"Location: {location}\r\n"
-                "Cache-Control: no-cache\r\n\r\n"
-            )
-            return header
-
-    # No match; will default to normal WebUI file system behavior
-    return None
+from vfs import build_vfs, vfs_bytes, watch_vfs
+from vfs_pack import load_pack
+from vfs_metrics import METRICS_FILE, STATS_PATH, export_json, instrument, metrics_enabled
+from webui_bytes import set_bytes_file_handler
 
 
 def exit_app(e: webui.Event):
@@ -124,6 +15,19 @@ def exit_app(e: webui.Event):
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Preact frontend in a WebUI window")
+    parser.add_argument("--watch", action="store_true",
+                        help="reload files from frontend/dist when they change (pair with `vite build --watch`)")
+    parser.add_argument("--pack", metavar="PATH",
+                        help="serve a bundle written by vfs_pack.py instead of frontend/dist "
+                             "(default inside a distribute.sh executable)")
+    parser.add_argument("--metrics", action="store_true", default=metrics_enabled(),
+                        help=f"record per-path request metrics, served at {STATS_PATH} and "
+                             f"written to {METRICS_FILE} on exit (also VFS_METRICS=1)")
+    args = parser.parse_args()
+    if args.pack and args.watch:
+        parser.error("--watch serves frontend/dist; it cannot be combined with --pack")
+
     # Create new window
     react_window = webui.Window()
 
@@ -144,7 +48,7 @@ def main():
 
     # VFS (Virtual File System) Example
     #
-    # 1. Build your list of files
+    # 1. Build your list of files (see vfs.py)
 
     # 2. Create a function with this type:
     #        Callable[[str], Optional[str]]
@@ -163,13 +67,36 @@ def main():
     #           return response_headers + response_body
     #
     # 4. pass that function into the set_file_handler(<handler>)
+    #
+    # Here the handler returns bytes instead (vfs_bytes), registered through
+    # the ctypes shim in webui_bytes.py so binary assets are never converted
+    # to str and back.
 
     # Build out the vfs and index list
     # build_vfs("./webui-react-example/build")
-    build_vfs("./frontend/dist")
+    # (lazy: files are read on first request, not up front;
+    #  .gz/.br variants written by dev_build.sh / distribute.sh at build time
+    #  are served to the browser instead of the uncompressed text assets)
+    #
+    # distribute.sh bundles the whole frontend into frontend.vfspack inside
+    # the PyInstaller executable; a frozen build serves from that (one mmap
+    # with every response prebuilt). From source, frontend/dist is served
+    # unless --pack is given, so a leftover pack never shadows a rebuild.
+    bundle_dir = getattr(sys, "_MEIPASS", None)
+    pack_path = args.pack or (os.path.join(bundle_dir, "frontend.vfspack") if bundle_dir else None)
+    if pack_path:
+        load_pack(pack_path)
+    else:
+        build_vfs("./frontend/dist", lazy=True)
 
     # Set a custom files handler
-    react_window.set_file_handler(vfs)
+    # (--metrics: wrapped to count requests, bytes and latency per path)
+    handler = instrument(vfs_bytes) if args.metrics else vfs_bytes
+    set_bytes_file_handler(react_window, handler)
+
+    # Dev loop: pick up rebuilt files and reload the page once a rebuild settles
+    if args.watch:
+        watch_vfs(on_change=lambda changed: react_window.run("location.reload();"))
 
     # Show the React window
     # react_window.show_browser("index.html", webui.Browser.Chrome)
@@ -181,6 +108,11 @@ def main():
     # Free all memory resources (Optional)
     webui.clean()
 
+    if args.metrics:
+        total = export_json(METRICS_FILE)["total"]
+        print(f"{total['requests']} requests, {total['bytes'] / 1e6:.1f} MB, "
+              f"p50 {total['p50_us']} us, p99 {total['p99_us']} us -> {METRICS_FILE}")
+
     print('Thank you.')
 
 
@@ -0,0 +1,756 @@
+import argparse
+import os
+import sys
+import gzip
+import hashlib
+import json
+import mimetypes
+import shutil
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Mapping, Optional
+from dataclasses import dataclass, field
+
+# brotli is optional; without it only .gz variants are generated
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+@dataclass
+class VirtualFile:
+    path: str
+    # File on disk and its stat info at build time
+    source: str
+    size: int
+    mtime: float
+    # Complete "200 OK" response: headers followed by the raw body bytes
+    # (a memoryview into the mapped file for packed bundles).
+    # Always set in eager mode; in lazy mode None until first requested and
+    # again after being evicted from `resident_files`.
+    response: Optional[bytes] = None
+    body_start: int = 0
+    lazy: bool = False
+    # Content-Encoding of this entry when it is a precompressed variant
+    encoding: Optional[str] = None
+    # Quoted content hash; set whenever the body has been read, kept on unload
+    etag: Optional[str] = None
+    # Content-Encoding -> precompressed copy of this file ("gzip", "br")
+    variants: dict[str, "VirtualFile"] = field(default_factory=dict, repr=False)
+
+    @property
+    def body(self) -> memoryview:
+        return memoryview(load_file(self))[self.body_start:]
+
+
+# Files kept loaded at once in lazy mode
+MAX_RESIDENT = 256
+# Seconds between directory polls in watch mode
+WATCH_INTERVAL = 0.5
+
+# Content-Encoding -> file suffix, in order of preference
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+# webui only passes the path to the file handler, never the request headers;
+# every browser webui can embed accepts gzip
+DEFAULT_ACCEPT_ENCODING = "gzip"
+# Precompress these types when at least MIN_COMPRESS_SIZE bytes
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json",
+                      "application/xml", "application/wasm", "image/svg+xml")
+MIN_COMPRESS_SIZE = 1024
+
+# Written by Vite with `build.manifest: true`; every file it lists under
+# file / css / assets carries a content hash in its name, so browsers may
+# cache those URLs for good. Without a manifest nothing is immutable.
+VITE_MANIFEST = "/.vite/manifest.json"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# Range requests are answered from the identity body only, and only when the
+# caller passes request headers. webui's file handler gets the path alone, so
+# in the app no 200 advertises Accept-Ranges: browsers then fetch media whole
+RANGE_UNIT = "bytes"
+
+# vpath -> VirtualFile, one dict lookup per request
+virtual_files: dict[str, VirtualFile] = {}
+# directory key ("/", "/docs/") -> path of that directory's index file
+index_files: dict[str, str] = {}
+# Lazily loaded files (by source path) in least- to most-recently used order
+resident_files: OrderedDict[str, VirtualFile] = OrderedDict()
+resident_lock = threading.Lock()
+max_resident = MAX_RESIDENT
+# Held while entries are added or replaced (build_vfs, refresh_vfs); lookups
+# are single dict reads and do not take it
+vfs_lock = threading.RLock()
+# What build_vfs was last called with, for refresh_vfs
+vfs_root: Optional[str] = None
+vfs_lazy = False
+# vpaths of content-hashed build output, from VITE_MANIFEST
+immutable_paths: set[str] = set()
+
+
+def build_vfs(directory: str, lazy: bool = False, resident: int = MAX_RESIDENT):
+    """
+    Scan a directory tree and populate the global virtual file indexes.
+
+    Walks through every file under `directory` and stores a `VirtualFile`
+    entry in `virtual_files` under its virtual path. Detects any files named
+    `index.*`, recording the first one per directory in `index_files`.
+
+    Eager mode (the default) reads every file as raw bytes and stores the
+    finished HTTP response (headers + body, as bytes) on the entry, so
+    requests only look it up.
+
+    Lazy mode only records paths and stat info, so startup cost does not
+    depend on bundle size. A file is read and its response built the first
+    time it is requested; at most `resident` files stay loaded, the least
+    recently used one being dropped first. Source maps and media that are never
+    requested are never read.
+
+    `name.gz` / `name.br` files next to `name` (written at build time by
+    precompress_tree / `python3 vfs.py DIR`, or by a Vite compression plugin)
+    become encoded variants of `name`, served instead of it when the request
+    accepts that encoding. Nothing is compressed here.
+
+    Files listed in Vite's build manifest (VITE_MANIFEST) are sent with an
+    immutable Cache-Control; everything else is revalidated.
+
+    Args:
+        directory: The root directory whose files will be served.
+        lazy:      Defer reading file bodies until first request.
+        resident:  In lazy mode, how many files may stay loaded at once.
+
+    Globals:
+        virtual_files:  Cleared and then filled with {vpath: VirtualFile}
+                        for each file found.
+        index_files:    Cleared and then filled with {dir_key: index_path}
+                        for each directory that has an index file.
+        resident_files: Emptied; lazily loaded entries are tracked here.
+        immutable_paths: Filled from the Vite manifest, if there is one.
+        vfs_root:       Set to `directory` for refresh_vfs / watch_vfs.
+    """
+    global max_resident, vfs_root, vfs_lazy
+    with vfs_lock:
+        reset_vfs()
+        max_resident = resident
+        vfs_root, vfs_lazy = directory, lazy
+
+        found = scan_tree(directory)
+        load_vite_manifest(found)
+        for vpath, (full, size, mtime) in found.items():
+            add_file(vpath, full, size, mtime)
+
+
+def reset_vfs():
+    """
+    Empty every index and unload all lazily loaded files.
+    """
+    global vfs_root
+    with vfs_lock:
+        with resident_lock:
+            for vf in resident_files.values():
+                drop_response(vf)
+            resident_files.clear()
+        virtual_files.clear()
+        index_files.clear()
+        immutable_paths.clear()
+        vfs_root = None
+
+
+def load_vite_manifest(found: dict[str, tuple[str, int, float]]):
+    """
+    Fill `immutable_paths` from the Vite manifest among `found` (a
+    scan_tree() result). Missing or unreadable manifests leave it empty.
+    """
+    immutable_paths.clear()
+    if VITE_MANIFEST not in found:
+        return
+    try:
+        with open(found[VITE_MANIFEST][0], 'rb') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return  # mid-rebuild; the next refresh reads it again
+    for chunk in manifest.values():
+        for name in [chunk.get("file"), *chunk.get("css", ()), *chunk.get("assets", ())]:
+            if name:
+                immutable_paths.add("/" + name.lstrip("/"))
+
+
+def scan_tree(directory: str) -> dict[str, tuple[str, int, float]]:
+    """
+    {vpath: (file path, size, mtime)} for every file under `directory`.
+    """
+    found = {}
+    for root, _, filenames in os.walk(directory):
+        rel_dir = os.path.relpath(root, directory).replace('\\','/')
+        if rel_dir == '.':
+            rel_dir = ''
+
+        for fn in filenames:
+            full = os.path.join(root, fn)
+            vpath = f"/{rel_dir}/{fn}".replace('//','/')
+            try:
+                st = os.stat(full)
+            except FileNotFoundError:
+                continue  # deleted mid-walk (rebuild in progress)
+            found[vpath] = (full, st.st_size, st.st_mtime)
+    return found
+
+
+def add_file(vpath: str, full: str, size: int, mtime: float):
+    """
+    Register one file in `virtual_files`, `index_files` and, for name.gz /
+    name.br, as an encoded variant of name. Caller holds `vfs_lock`.
+
+    An existing entry for `vpath` is replaced in a single assignment once the
+    new one (and its variants) is complete, then unloaded, so lookups never
+    miss while a file is being reloaded.
+    """
+    vf = VirtualFile(path=vpath, source=full, size=size, mtime=mtime, lazy=vfs_lazy)
+    if not vfs_lazy:
+        # read raw bytes
+        with open(full, 'rb') as f:
+            fill_response(vf, f.read())
+
+    # Attach name.gz / name.br to name, whichever of the two arrives first
+    for encoding, suffix in ENCODING_SUFFIXES.items():
+        if vpath + suffix in virtual_files:
+            attach_variant(vf, virtual_files[vpath + suffix], encoding)
+
+    old = virtual_files.get(vpath)
+    virtual_files[vpath] = vf
+    if old is not None:
+        unload_file(old)
+        for variant in old.variants.values():
+            unload_file(variant)
+
+    dir_key, fn = vpath.rsplit('/', 1)
+    if is_index_name(fn):
+        index_files.setdefault(dir_key + '/', vpath)
+
+    for encoding, suffix in ENCODING_SUFFIXES.items():
+        if vpath.endswith(suffix) and vpath[:-len(suffix)] in virtual_files:
+            attach_variant(virtual_files[vpath[:-len(suffix)]], vf, encoding)
+
+
+def is_index_name(fn: str) -> bool:
+    """
+    Whether file name `fn` can be a directory's index: index.* but not a
+    precompressed index.html.gz / .br, which is served only as a variant.
+    """
+    return fn.startswith("index.") and not fn.endswith(tuple(ENCODING_SUFFIXES.values()))
+
+
+def attach_variant(base: VirtualFile, encoded: VirtualFile, encoding: str):
+    """
+    Serve `encoded` (the name.gz / name.br entry) as `base` with Content-Encoding.
+
+    A variant older than `base` was compressed from a previous build (e.g.
+    index.html rebuilt by `vite build --watch`); it is not attached, and
+    `base` is served uncompressed until the tree is precompressed again.
+    """
+    if encoded.mtime < base.mtime:
+        stale = base.variants.pop(encoding, None)
+        if stale is not None:
+            unload_file(stale)
+        return
+    variant = VirtualFile(path=base.path, source=encoded.source, size=encoded.size,
+                          mtime=encoded.mtime, lazy=vfs_lazy, encoding=encoding)
+    if not vfs_lazy:
+        fill_response(variant, encoded.body)
+    old = base.variants.get(encoding)
+    if old is not None:
+        unload_file(old)
+    base.variants[encoding] = variant
+
+
+def remove_file(vpath: str):
+    """
+    Drop one file from the indexes (and from its base's variants).
+    Caller holds `vfs_lock`.
+    """
+    vf = virtual_files.pop(vpath, None)
+    if vf is None:
+        return
+    unload_file(vf)
+
+    for encoding, suffix in ENCODING_SUFFIXES.items():
+        base = virtual_files.get(vpath[:-len(suffix)]) if vpath.endswith(suffix) else None
+        if base is not None and encoding in base.variants:
+            unload_file(base.variants.pop(encoding))
+
+    dir_key = vpath.rsplit('/', 1)[0] + '/'
+    if index_files.get(dir_key) == vpath:
+        del index_files[dir_key]
+        for other in virtual_files:
+            if other.rsplit('/', 1)[0] + '/' == dir_key and is_index_name(other.rsplit('/', 1)[1]):
+                index_files[dir_key] = other
+                break
+
+
+def refresh_vfs() -> list[str]:
+    """
+    Bring the indexes in line with the directory given to build_vfs.
+
+    Only entries whose size or mtime changed are rebuilt; new files are
+    added and deleted ones removed. Updates happen under `vfs_lock`, while
+    requests keep being served from the entries already in place: a changed
+    file's old entry is swapped for the new one only once that is built.
+
+    Returns:
+        The virtual paths that were added, changed or removed.
+    """
+    if vfs_root is None:
+        return []
+    current = scan_tree(vfs_root)
+
+    changed = []
+    with vfs_lock:
+        # Before any entry is built, so new chunks get the right Cache-Control
+        old, new = virtual_files.get(VITE_MANIFEST), current.get(VITE_MANIFEST)
+        if (old and (old.size, old.mtime)) != (new and new[1:]):
+            load_vite_manifest(current)
+        for vpath in [p for p in virtual_files if p not in current]:
+            remove_file(vpath)
+            changed.append(vpath)
+        for vpath, (full, size, mtime) in current.items():
+            vf = virtual_files.get(vpath)
+            if vf is not None and vf.size == size and vf.mtime == mtime:
+                continue
+            try:
+                add_file(vpath, full, size, mtime)
+            except FileNotFoundError:
+                continue  # deleted since the scan; the next poll settles it
+            changed.append(vpath)
+    return changed
+
+
+def watch_vfs(interval: float = WATCH_INTERVAL,
+              on_change: Optional[Callable[[list[str]], None]] = None) -> threading.Event:
+    """
+    Poll the served directory for changes in a daemon thread.
+
+    Every `interval` seconds refresh_vfs() runs. A rebuild writes many files
+    over a few polls; `on_change` is called once with all changed paths when a
+    poll finds nothing new after some changes (i.e. the rebuild has settled).
+
+    Args:
+        interval:  Seconds between polls (mtime polling, no inotify needed).
+        on_change: Called with the changed virtual paths, e.g. to reload the page.
+
+    Returns:
+        An Event; set it to stop watching.
+    """
+    stop = threading.Event()
+
+    def poll():
+        pending: list[str] = []
+        while not stop.wait(interval):
+            changed = refresh_vfs()
+            if changed:
+                pending.extend(changed)
+            elif pending:
+                if on_change is not None:
+                    on_change(list(dict.fromkeys(pending)))
+                pending = []
+
+    threading.Thread(target=poll, name="vfs-watch", daemon=True).start()
+    return stop
+
+
+def is_compressible(path: str) -> bool:
+    """
+    Whether `path` is a text-like asset worth storing precompressed.
+    """
+    ctype = mimetypes.guess_type(path)[0] or ""
+    return ctype.startswith(COMPRESSIBLE_TYPES)
+
+
+def precompress_tree(directory: str) -> int:
+    """
+    Write `.gz` (and `.br` when brotli is installed) next to text assets.
+
+    Variants newer than their source are left alone, so after the first run
+    this only stats the tree. Files below MIN_COMPRESS_SIZE, binary types and
+    existing variants are skipped. Returns the number of files written.
+
+    Args:
+        directory: The built frontend directory, e.g. ./frontend/dist.
+    """
+    written = 0
+    for root, _, filenames in os.walk(directory):
+        for fn in filenames:
+            full = os.path.join(root, fn)
+            if fn.endswith(tuple(ENCODING_SUFFIXES.values())) or not is_compressible(fn):
+                continue
+            st = os.stat(full)
+            if st.st_size < MIN_COMPRESS_SIZE:
+                continue
+
+            for encoding, suffix in ENCODING_SUFFIXES.items():
+                if encoding == "br" and brotli is None:
+                    continue
+                target = full + suffix
+                if os.path.exists(target) and os.stat(target).st_mtime >= st.st_mtime:
+                    continue
+                tmp = target + ".tmp"
+                if encoding == "br":
+                    with open(full, 'rb') as fin, open(tmp, 'wb') as fout:
+                        fout.write(brotli.compress(fin.read(), quality=11))
+                else:
+                    # mtime=0 keeps the output identical across runs
+                    with open(full, 'rb') as fin, open(tmp, 'wb') as raw, \
+                            gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=9, mtime=0) as fout:
+                        shutil.copyfileobj(fin, fout)
+                os.replace(tmp, target)
+                written += 1
+    return written
+
+
+def fill_response(vf: VirtualFile, data) -> None:
+    """
+    Build and store the "200 OK" response for `vf` with body `data`
+    (bytes, memoryview or mmap; copied once into the response).
+    """
+    vf.etag = content_etag(data)
+    header = ok_header(vf.path, len(data), vf.encoding, vf.etag).encode('latin-1')
+    vf.response = b"".join((header, data))
+    vf.body_start = len(header)
+
+
+def content_etag(data) -> str:
+    """
+    Strong ETag (quoted) for a body.
+    """
+    return '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+
+
+def cache_control(path: str) -> str:
+    """
+    Cache-Control for `path`: immutable for the content-hashed files in the
+    Vite manifest, revalidate-by-ETag for everything else (index.html,
+    public/ files such as logo-original.png).
+    """
+    return IMMUTABLE_CACHE_CONTROL if path in immutable_paths else REVALIDATE_CACHE_CONTROL
+
+
+def ok_header(path: str, length: int, encoding: Optional[str] = None,
+              etag: Optional[str] = None) -> str:
+    """
+    "200 OK" status line and headers for a file of `length` bytes,
+    stored with Content-Encoding `encoding` if given.
+    """
+    ctype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    encoded = f"Content-Encoding: {encoding}\r\nVary: Accept-Encoding\r\n" if encoding else ""
+    tagged = f"ETag: {etag}\r\n" if etag else ""
+    return (
+        "HTTP/1.1 200 OK\r\n"
+        f"Content-Type: {ctype}\r\n"
+        f"Content-Length: {length}\r\n"
+        f"{encoded}"
+        f"{tagged}"
+        f"Cache-Control: {cache_control(path)}\r\n\r\n"
+    )
+
+
+def partial_header(path: str, start: int, end: int, size: int,
+                   etag: Optional[str] = None) -> str:
+    """
+    "206 Partial Content" status line and headers for bytes `start`..`end`
+    (inclusive) of a `size` byte file.
+    """
+    ctype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    tagged = f"ETag: {etag}\r\n" if etag else ""
+    return (
+        "HTTP/1.1 206 Partial Content\r\n"
+        f"Content-Type: {ctype}\r\n"
+        f"Content-Length: {end - start + 1}\r\n"
+        f"Content-Range: {RANGE_UNIT} {start}-{end}/{size}\r\n"
+        f"Accept-Ranges: {RANGE_UNIT}\r\n"
+        f"{tagged}"
+        f"Cache-Control: {cache_control(path)}\r\n\r\n"
+    )
+
+
+@lru_cache(maxsize=64)
+def range_not_satisfiable_response(size: int) -> bytes:
+    """
+    "416 Range Not Satisfiable" for a `size` byte file.
+    """
+    return (
+        "HTTP/1.1 416 Range Not Satisfiable\r\n"
+        f"Content-Range: {RANGE_UNIT} */{size}\r\n"
+        "Content-Length: 0\r\n\r\n"
+    ).encode('latin-1')
+
+
+def parse_range(range_header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    (start, end) byte positions, inclusive, requested by a Range header.
+
+    Handles a single `bytes=a-b`, `bytes=a-` or `bytes=-n` range; the end is
+    clamped to the file. start >= size means the range is not satisfiable.
+    Returns None for anything else (other units, multiple ranges, malformed
+    values), in which case the whole file is sent.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != RANGE_UNIT or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep or not (first or last):
+        return None
+    if (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+
+    if not first:
+        # Suffix range: the last n bytes; "-0" selects nothing
+        suffix = int(last)
+        return (max(size - suffix, 0) if suffix else size), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def range_response(vf: VirtualFile, range_header: str,
+                   if_range: Optional[str] = None) -> Optional[bytes]:
+    """
+    "206 Partial Content" (or 416) answer to a Range request for `vf`.
+
+    Only the requested bytes are copied: they are sliced from the loaded
+    response (the pack mapping for packed bundles), or read with pread when
+    a lazy entry is not loaded. Reached only through the headers API; see
+    RANGE_UNIT.
+
+    Returns None when the range should be ignored and the full response sent:
+    unsupported or malformed ranges, and an If-Range validator that is not
+    the file's current ETag.
+    """
+    if if_range is not None and (vf.etag is None or if_range.strip() != vf.etag):
+        return None
+    byte_range = parse_range(range_header, vf.size)
+    if byte_range is None:
+        return None
+    start, end = byte_range
+    if start >= vf.size:
+        return range_not_satisfiable_response(vf.size)
+
+    header = partial_header(vf.path, start, end, vf.size, vf.etag).encode('latin-1')
+    response = vf.response
+    if response is not None:
+        offset = vf.body_start
+        with memoryview(response) as view:
+            return b"".join((header, view[offset + start:offset + end + 1]))
+    fd = os.open(vf.source, os.O_RDONLY)
+    try:
+        return b"".join((header, os.pread(fd, end - start + 1, start)))
+    finally:
+        os.close(fd)
+
+
+@lru_cache(maxsize=1024)
+def not_modified_response(path: str, etag: str, encoding: Optional[str] = None) -> bytes:
+    """
+    "304 Not Modified" answer to a matching If-None-Match.
+    """
+    vary = "Vary: Accept-Encoding\r\n" if encoding else ""
+    return (
+        "HTTP/1.1 304 Not Modified\r\n"
+        f"ETag: {etag}\r\n"
+        f"{vary}"
+        f"Cache-Control: {cache_control(path)}\r\n\r\n"
+    ).encode('latin-1')
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    If-None-Match comparison (weak, as RFC 9110 requires for this header).
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+@lru_cache(maxsize=64)
+def accepted_encodings(accept_encoding: str) -> frozenset:
+    """
+    Codings a client accepts, from its Accept-Encoding header (q=0 excluded).
+    """
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        q = params.strip().removeprefix("q=") if params else "1"
+        try:
+            if float(q) > 0:
+                accepted.add(coding.strip())
+        except ValueError:
+            continue
+    return frozenset(accepted)
+
+
+@lru_cache(maxsize=None)
+def redirect_response(location: str) -> bytes:
+    """
+    "302 Found" response pointing at `location`; one object per index file.
+    """
+    return (
+        "HTTP/1.1 302 Found\r\n"
+        f"Location: {location}\r\n"
+        "Cache-Control: no-cache\r\n\r\n"
+    ).encode('latin-1')
+
+
+def load_file(vf: VirtualFile) -> bytes:
+    """
+    Return the response for `vf`, reading and building it first if needed.
+
+    The file is read straight into the response; nothing else (no mmap, no
+    open file) is kept per resident entry.
+
+    Lazy entries are (re)registered as most recently used; once more than
+    `max_resident` are loaded the oldest one is unloaded.
+    """
+    response = vf.response
+    if not vf.lazy:
+        return response
+
+    if response is None:
+        with open(vf.source, 'rb') as f:
+            fill_response(vf, f.read())
+        response = vf.response
+
+    with resident_lock:
+        resident_files[vf.source] = vf
+        resident_files.move_to_end(vf.source)
+        while len(resident_files) > max_resident:
+            _, old = resident_files.popitem(last=False)
+            drop_response(old)
+    return response
+
+
+def unload_file(vf: VirtualFile):
+    """
+    Stop tracking `vf` as resident and drop its loaded response.
+    """
+    with resident_lock:
+        if resident_files.get(vf.source) is vf:
+            del resident_files[vf.source]
+    drop_response(vf)
+
+
+def drop_response(vf: VirtualFile):
+    """
+    Drop a lazy entry's response; the next request reloads it.
+    """
+    if not vf.lazy:
+        return
+    vf.response = None
+
+
+def virtual_file_system(path: str) -> Optional[VirtualFile]:
+    """
+    Returns the matching VirtualFile or None.
+    """
+    return virtual_files.get(path)
+
+
+def served_file(path: str, headers: Optional[Mapping[str, str]] = None) -> Optional[VirtualFile]:
+    """
+    The entry vfs_bytes answers `path` from: the file itself, or the
+    precompressed variant the request's Accept-Encoding prefers. Range
+    requests refer to the identity body, so they never get a variant.
+    """
+    vf = virtual_file_system(path)
+    if vf is None or not vf.variants:
+        return vf
+    headers = headers or {}
+    if headers.get("range"):
+        return vf
+    accepted = accepted_encodings(headers.get("accept-encoding", DEFAULT_ACCEPT_ENCODING))
+    for encoding in ENCODING_SUFFIXES:
+        if encoding in accepted and encoding in vf.variants:
+            return vf.variants[encoding]
+    return vf
+
+
+def vfs_bytes(path: str, headers: Optional[Mapping[str, str]] = None) -> Optional[bytes]:
+    """
+    Binary-safe handler, for webui_bytes.set_bytes_file_handler().
+    Type needed: Callable[[str], Optional[bytes]]
+    - If exact file found, return its prebuilt "200 OK" headers + body
+      (loaded from disk first in lazy mode), using a precompressed variant
+      when the request accepts its encoding, or "304 Not Modified" when
+      If-None-Match carries the file's ETag, or "206 Partial Content" for a
+      single-range Range request (see range_response).
+    - Else, check index_files for a 302 redirect.
+    - Else, return None.
+    Responses are cached bytes, so a hit returns the same object every time
+    and nothing is copied on the Python side.
+
+    `headers` are the request headers with lower-case names. webui does not
+    pass them, so without them Accept-Encoding is DEFAULT_ACCEPT_ENCODING
+    and the 304 / 206 answers are never produced: those exist for callers
+    that do have the headers, not for the webui window.
+    """
+    headers = headers or {}
+
+    # Try exact file (or the encoded variant the request accepts)
+    vf = served_file(path, headers)
+    if vf is not None:
+        range_header = headers.get("range")
+        if_none_match = headers.get("if-none-match")
+        if if_none_match:
+            if vf.etag is None:
+                load_file(vf)  # lazy entry never read yet
+            if etag_matches(if_none_match, vf.etag):
+                return not_modified_response(vf.path, vf.etag, vf.encoding)
+        if range_header:
+            partial = range_response(vf, range_header, headers.get("if-range"))
+            if partial is not None:
+                return partial
+        return load_file(vf)
+
+    # Not found; check for index redirect
+    redirect_path = path
+    if not redirect_path.endswith('/'):
+        redirect_path += '/'
+
+    location = index_files.get(redirect_path)
+    if location is not None:
+        return redirect_response(location)
+
+    # No match; will default to normal WebUI file system behavior
+    return None
+
+
+def vfs(path: str, headers: Optional[Mapping[str, str]] = None) -> Optional[str]:
+    """
+    Handler function for set_file_handler(),
+    Type needed: Callable[[str], Optional[str]]
+    Same responses as vfs_bytes(), decoded via Latin-1 (1:1 byte -> character)
+    because webui's Python binding only accepts str. That costs a decode here
+    and an encode in webui per request; prefer vfs_bytes with the bytes shim.
+    """
+    response = vfs_bytes(path, headers)
+    return str(response, 'latin-1') if response is not None else None
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        description="Write .gz/.br variants next to the text assets of a built frontend "
+                    "(run after `bun run build`; the app never compresses at startup)")
+    parser.add_argument("directory", help="built frontend, e.g. frontend/dist")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"{args.directory} not found; build the frontend first")
+        return 1
+    written = precompress_tree(args.directory)
+    print(f"Precompressed {written} files in {args.directory}"
+          f"{'' if brotli is not None else ' (gzip only; install brotli for .br)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,226 @@
+"""
+Request metrics and tracing for the VFS file handler.
+
+instrument() wraps a handler such as vfs.vfs_bytes and records, per path:
+requests, bytes sent, response status, lazy loads from disk and a latency
+histogram (p50 / p99). The wrapper also answers STATS_PATH with the current
+snapshot as JSON, so the numbers can be read from the running window:
+
+  python3 main.py --metrics                 # or VFS_METRICS=1
+  open http://localhost:<port>/__vfs/stats  # or see vfs-metrics.json on exit
+
+VFS_TRACE=1 additionally prints one line per request to stderr.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Callable, Mapping, Optional
+
+import vfs
+
+# Served by the instrumented handler itself, never looked up in the VFS
+STATS_PATH = "/__vfs/stats"
+# Written by main.py on exit when metrics are enabled
+METRICS_FILE = "vfs-metrics.json"
+# Upper bounds of the latency buckets in microseconds (1 us .. ~1 s); slower
+# requests land in one overflow bucket
+LATENCY_BUCKETS_US = tuple(2 ** i for i in range(21))
+# Status reported when the handler returns None and webui serves the path
+MISS = "miss"
+
+
+@dataclass
+class PathStats:
+    requests: int = 0
+    # Response bytes handed to webui, headers included
+    bytes: int = 0
+    # HTTP status ("200", "304", ...) or MISS -> count
+    statuses: dict[str, int] = field(default_factory=dict)
+    # Lazy entries read from disk for this request (not resident yet)
+    loads: int = 0
+    # Request count per LATENCY_BUCKETS_US bucket, plus the overflow bucket
+    latency: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_US) + 1))
+
+
+# vpath -> PathStats, for every path requested since the last reset
+path_stats: dict[str, PathStats] = {}
+metrics_lock = threading.Lock()
+started_at = time.time()
+
+
+def metrics_enabled() -> bool:
+    """
+    Whether the VFS_METRICS environment variable asks for metrics.
+    """
+    return os.environ.get("VFS_METRICS", "") not in ("", "0")
+
+
+def trace_enabled() -> bool:
+    """
+    Whether the VFS_TRACE environment variable asks for per-request tracing.
+    """
+    return os.environ.get("VFS_TRACE", "") not in ("", "0")
+
+
+def instrument(handler: Callable[..., Optional[bytes]],
+               trace: Optional[bool] = None) -> Callable[..., Optional[bytes]]:
+    """
+    Wrap a VFS handler so each call is recorded in `path_stats`.
+
+    The wrapper has the handler's signature (path, headers=None) and returns
+    its response unchanged, except for STATS_PATH, which it answers itself
+    with stats_response().
+
+    Args:
+        handler: The handler to measure, e.g. vfs.vfs_bytes.
+        trace:   Print a line per request to stderr; defaults to VFS_TRACE.
+    """
+    if trace is None:
+        trace = trace_enabled()
+
+    def instrumented(path: str, headers: Optional[Mapping[str, str]] = None) -> Optional[bytes]:
+        if path == STATS_PATH:
+            return stats_response()
+
+        # The entry actually served, e.g. the .gz variant of a precompressed asset
+        vf = vfs.served_file(path, headers)
+        cold = vf is not None and vf.lazy and vf.response is None
+        start = time.perf_counter_ns()
+        response = handler(path, headers)
+        elapsed_us = (time.perf_counter_ns() - start) / 1000
+
+        status = MISS if response is None else bytes(response[9:12]).decode('latin-1')
+        length = 0 if response is None else len(response)
+        record(path, status, length, elapsed_us, cold and vf.response is not None)
+        if trace:
+            print(f"vfs {status:>4} {length:>10} B {elapsed_us:10.1f} us  {path}", file=sys.stderr)
+        return response
+
+    return instrumented
+
+
+def record(path: str, status: str, length: int, elapsed_us: float, loaded: bool = False):
+    """
+    Add one request to the stats of `path`.
+    """
+    bucket = bisect_left(LATENCY_BUCKETS_US, elapsed_us)
+    with metrics_lock:
+        stats = path_stats.get(path)
+        if stats is None:
+            stats = path_stats[path] = PathStats()
+        stats.requests += 1
+        stats.bytes += length
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+        stats.loads += loaded
+        stats.latency[bucket] += 1
+
+
+def reset_metrics():
+    """
+    Forget everything recorded so far.
+    """
+    global started_at
+    with metrics_lock:
+        path_stats.clear()
+        started_at = time.time()
+
+
+def percentile(latency: list[int], q: float) -> Optional[float]:
+    """
+    Upper bound (us) of the bucket holding the `q` quantile, 0 < q <= 1.
+
+    Resolution is a factor of two. None for an empty histogram, and also when
+    the quantile falls in the overflow bucket (slower than the last bound),
+    so snapshots stay valid JSON.
+    """
+    total = sum(latency)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bucket, count in enumerate(latency[:len(LATENCY_BUCKETS_US)]):
+        seen += count
+        if seen >= rank:
+            return LATENCY_BUCKETS_US[bucket]
+    return None
+
+
+def summarize(stats: PathStats) -> dict:
+    """
+    JSON-ready view of one PathStats.
+    """
+    hits = stats.requests - stats.statuses.get(MISS, 0)
+    return {
+        "requests": stats.requests,
+        "bytes": stats.bytes,
+        "statuses": dict(stats.statuses),
+        "hits": hits,
+        "misses": stats.statuses.get(MISS, 0),
+        "not_modified": stats.statuses.get("304", 0),
+        "loads": stats.loads,
+        "p50_us": percentile(stats.latency, 0.50),
+        "p99_us": percentile(stats.latency, 0.99),
+    }
+
+
+def snapshot() -> dict:
+    """
+    Totals plus per-path stats, busiest paths first.
+
+    `hits` are requests the VFS answered (any status), `misses` the ones it
+    left to webui; `not_modified` counts 304s (served from the browser cache)
+    and `loads` lazy files read from disk rather than from resident memory.
+    """
+    with metrics_lock:
+        copies = {path: PathStats(s.requests, s.bytes, dict(s.statuses), s.loads, list(s.latency))
+                  for path, s in path_stats.items()}
+        since = started_at
+
+    total = PathStats()
+    for stats in copies.values():
+        total.requests += stats.requests
+        total.bytes += stats.bytes
+        total.loads += stats.loads
+        for status, count in stats.statuses.items():
+            total.statuses[status] = total.statuses.get(status, 0) + count
+        total.latency = [a + b for a, b in zip(total.latency, stats.latency)]
+
+    ordered = sorted(copies.items(), key=lambda item: -item[1].requests)
+    return {
+        "since": since,
+        "uptime_s": round(time.time() - since, 3),
+        "resident_files": len(vfs.resident_files),
+        "total": summarize(total),
+        "paths": {path: summarize(stats) for path, stats in ordered},
+    }
+
+
+def export_json(path: str = METRICS_FILE) -> dict:
+    """
+    Write snapshot() to `path` as JSON and return it.
+    """
+    data = snapshot()
+    tmp = path + ".tmp"
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+    return data
+
+
+def stats_response() -> bytes:
+    """
+    "200 OK" response carrying snapshot() as JSON, for STATS_PATH.
+    """
+    body = json.dumps(snapshot(), indent=2).encode('utf-8')
+    header = (
+        "HTTP/1.1 200 OK\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Cache-Control: no-store\r\n\r\n"
+    ).encode('latin-1')
+    return b"".join((header, body))
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Single-file packed asset bundle for the VFS.
+
+A pack holds every response the VFS would build for a dist tree, so a
+distributed app needs no ./frontend/dist on disk and no directory walk:
+
+  header  magic "VFSPACK\\0", version, entry count, index length (little-endian)
+  index   UTF-8 JSON list of {path, offset, length, body_start, mime, etag,
+          encoding}; `offset` is relative to the start of the blob
+  blob    complete HTTP responses (headers + body) back to back
+
+load_pack() maps the file once and serves each entry as a memoryview slice
+of the mapping, which webui_bytes hands to webui without copying.
+
+  python3 vfs_pack.py frontend/dist frontend.vfspack
+"""
+
+import argparse
+import json
+import mimetypes
+import mmap
+import os
+import struct
+import sys
+from typing import List
+
+import vfs
+from vfs import ENCODING_SUFFIXES, VirtualFile
+
+PACK_MAGIC = b"VFSPACK\0"
+PACK_VERSION = 1
+# magic, version, entry count, index length
+_PACK_HEADER = struct.Struct("<8sIIQ")
+
+
+def write_pack(directory: str, path: str, precompress: bool = True) -> int:
+    """
+    Pack the responses for every file under `directory` into `path`.
+
+    Uses build_vfs, so headers (ETag, Cache-Control, Content-Encoding) are
+    exactly what the VFS would send. name.gz / name.br files are stored only
+    as encoded variants of name. Returns the number of entries written.
+
+    Args:
+        directory:   The built frontend directory, e.g. ./frontend/dist.
+        path:        Output pack file.
+        precompress: Generate and include .gz/.br variants of text assets.
+    """
+    if precompress:
+        vfs.precompress_tree(directory)
+    vfs.build_vfs(directory)
+
+    entries = []
+    for vpath, vf in vfs.virtual_files.items():
+        if any(vpath.endswith(s) and vpath[:-len(s)] in vfs.virtual_files
+               for s in ENCODING_SUFFIXES.values()):
+            continue
+        entries.append(vf)
+        entries.extend(vf.variants.values())
+
+    index = []
+    offset = 0
+    for vf in entries:
+        index.append({
+            "path": vf.path,
+            "offset": offset,
+            "length": len(vf.response),
+            "body_start": vf.body_start,
+            "mime": mimetypes.guess_type(vf.path)[0] or "application/octet-stream",
+            "etag": vf.etag,
+            "encoding": vf.encoding,
+        })
+        offset += len(vf.response)
+    index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, len(index), len(index_bytes)))
+        f.write(index_bytes)
+        for vf in entries:
+            f.write(vf.response)
+    os.replace(tmp, path)
+    return len(index)
+
+
+def load_pack(path: str):
+    """
+    Serve the VFS from a pack written by write_pack().
+
+    Startup is one open() and mmap plus parsing the index; every entry's
+    response is a slice of the mapping, paged in by the OS on first use.
+
+    Globals (module vfs):
+        virtual_files: Cleared and filled from the pack.
+        index_files:   Cleared and filled from the packed index.* paths.
+    """
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, count, index_length = _PACK_HEADER.unpack_from(mapping, 0)
+    if magic != PACK_MAGIC:
+        raise ValueError(f"{path}: not a VFS pack")
+    if version != PACK_VERSION:
+        raise ValueError(f"{path}: pack version {version}, expected {PACK_VERSION}")
+    blob_start = _PACK_HEADER.size + index_length
+    index = json.loads(mapping[_PACK_HEADER.size:blob_start])
+    if len(index) != count:
+        raise ValueError(f"{path}: truncated index")
+
+    view = memoryview(mapping)
+    mtime = os.stat(path).st_mtime
+    with vfs.vfs_lock:
+        vfs.reset_vfs()
+        variants = []
+        for item in index:
+            start, length = blob_start + item["offset"], item["length"]
+            vf = VirtualFile(path=item["path"], source=path, size=length - item["body_start"],
+                             mtime=mtime, response=view[start:start + length],
+                             body_start=item["body_start"], encoding=item["encoding"],
+                             etag=item["etag"])
+            if vf.encoding:
+                variants.append(vf)
+                continue
+            vfs.virtual_files[vf.path] = vf
+            dir_key, fn = vf.path.rsplit("/", 1)
+            if vfs.is_index_name(fn):
+                vfs.index_files.setdefault(dir_key + "/", vf.path)
+        for vf in variants:
+            base = vfs.virtual_files.get(vf.path)
+            if base is not None:
+                base.variants[vf.encoding] = vf
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Pack a built frontend into one VFS bundle")
+    parser.add_argument("directory", help="built frontend, e.g. frontend/dist")
+    parser.add_argument("output", help="pack file to write, e.g. frontend.vfspack")
+    parser.add_argument("--no-precompress", action="store_true",
+                        help="do not generate or include .gz/.br variants")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"{args.directory} not found; build the frontend first")
+        return 1
+    count = write_pack(args.directory, args.output, precompress=not args.no_precompress)
+    print(f"Packed {count} responses into {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,104 @@
+import ctypes
+import traceback
+from ctypes import CFUNCTYPE, POINTER, c_char_p, c_int, c_size_t, c_void_p
+from typing import Callable, Optional
+
+from webui import webui
+from webui import webui_bindings as _raw
+
+# Anything exposing the buffer protocol: bytes, bytearray, memoryview, mmap
+Buffer = object
+
+# const void* handler(const char* filename, int* length)
+FILE_HANDLER = CFUNCTYPE(c_void_p, c_char_p, POINTER(c_int))
+
+# Callbacks must outlive the window, or ctypes frees the trampoline
+_handlers: dict[int, FILE_HANDLER] = {}
+
+
+class Py_buffer(ctypes.Structure):
+    _fields_ = [
+        ("buf", c_void_p),
+        ("obj", ctypes.py_object),
+        ("len", ctypes.c_ssize_t),
+        ("itemsize", ctypes.c_ssize_t),
+        ("readonly", c_int),
+        ("ndim", c_int),
+        ("format", c_char_p),
+        ("shape", POINTER(ctypes.c_ssize_t)),
+        ("strides", POINTER(ctypes.c_ssize_t)),
+        ("suboffsets", POINTER(ctypes.c_ssize_t)),
+        ("internal", c_void_p),
+    ]
+
+
+PyBUF_SIMPLE = 0
+_get_buffer = ctypes.pythonapi.PyObject_GetBuffer
+_get_buffer.argtypes = [ctypes.py_object, POINTER(Py_buffer), c_int]
+_get_buffer.restype = c_int
+_release_buffer = ctypes.pythonapi.PyBuffer_Release
+_release_buffer.argtypes = [POINTER(Py_buffer)]
+_release_buffer.restype = None
+
+
+def respond(window_id: int, response: Optional[Buffer]):
+    """
+    Hand `response` to webui without copying it on the Python side.
+
+    webui_interface_set_response_file_handler copies the bytes into its own
+    allocation before returning, so the buffer only has to stay valid (and
+    exported) for the duration of the call.
+    """
+    if response is None:
+        _raw.webui_interface_set_response_file_handler(window_id, None, 0)
+        return
+
+    view = Py_buffer()
+    # Also works for read-only buffers (bytes, ACCESS_READ mmaps), which
+    # ctypes' from_buffer refuses; raises TypeError for non-buffers
+    try:
+        _get_buffer(response, ctypes.byref(view), PyBUF_SIMPLE)
+    except TypeError:
+        _raw.webui_interface_set_response_file_handler(window_id, None, 0)
+        raise
+    try:
+        _raw.webui_interface_set_response_file_handler(window_id, view.buf, view.len)
+    finally:
+        _release_buffer(ctypes.byref(view))
+
+
+def set_bytes_file_handler(window: webui.Window, handler: Callable[[str], Optional[Buffer]]):
+    """
+    Binary-safe replacement for Window.set_file_handler().
+
+    The Python binding wants a str, which it encodes via Latin-1 into a fresh
+    ctypes buffer (two full copies per request) and answers from a new thread
+    per request. This registers the C file handler directly: `handler` returns
+    the full HTTP response as bytes / memoryview / mmap (or None to fall back
+    to webui's own file serving) and the response is passed straight to webui
+    from the calling server thread.
+
+    Args:
+        window:  The webui window to serve files for.
+        handler: Callable[[str], Optional[bytes]], e.g. vfs.vfs_bytes.
+    """
+    window_id = window.get_window_id
+
+    _raw.webui_set_file_handler.argtypes = [c_size_t, FILE_HANDLER]
+    _raw.webui_set_file_handler.restype = None
+    # webui waits for webui_interface_set_response_file_handler instead of
+    # using the callback's return value
+    _raw.webui_set_config(_raw.WebuiConfig.asynchronous_response, True)
+
+    def c_handler(filename: bytes, _length) -> None:
+        # Always answer, or the request hangs until webui times out
+        try:
+            response = handler(filename.decode("utf-8"))
+        except Exception:
+            traceback.print_exc()
+            response = None
+        respond(window_id, response)
+        return None
+
+    _handlers[window_id] = FILE_HANDLER(c_handler)
+    _raw.webui_set_file_handler(window_id, _handlers[window_id])
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Interactive impact queries over the apt dependency graph.
+
+Answers "what breaks if I remove X" (ancestors), "what does X pull in"
+(descendants) and "what do X and Y both depend on" (shared). The graph is
+condensed into strongly connected components once; closure sizes for every
+package are precomputed in a single pass, and member lists are computed on
+demand and memoized per SCC, so repeated queries are dictionary lookups.
+
+Usage:
+  python3 apt_query.py                          # REPL, one JSON answer per line
+  python3 apt_query.py ancestors libssl3        # single query, JSON output
+  python3 apt_query.py shared curl wget
+  python3 apt_query.py --available count libc6  # use apt-cache dumpavail
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, FrozenSet, List
+
+import networkx as nx
+
+from deb_control import dependency_map, read_dpkg_status, stream_packages
+from depgraph import condense, reachable_sccs
+
+QUERIES = ("ancestors", "descendants", "shared", "count")
+
+
+class ImpactIndex:
+    """Precomputed reverse-dependency index over a dependency graph."""
+
+    def __init__(self, G: nx.DiGraph):
+        self.cond = condense(G)
+        self.ancestor_sizes = self.cond.closure_sizes(upward=True)
+        self.descendant_sizes = self.cond.closure_sizes()
+        self._ancestors: Dict[int, FrozenSet[int]] = {}
+        self._descendants: Dict[int, FrozenSet[int]] = {}
+
+    def _scc(self, pkg: str) -> int:
+        try:
+            return self.cond.scc_of[pkg]
+        except KeyError:
+            raise KeyError(f"unknown package: {pkg}") from None
+
+    def _closure(self, pkg: str, upward: bool) -> FrozenSet[int]:
+        c = self._scc(pkg)
+        cache = self._ancestors if upward else self._descendants
+        if c not in cache:
+            adjacency = self.cond.pred if upward else self.cond.succ
+            cache[c] = frozenset(reachable_sccs(adjacency, c))
+        return cache[c]
+
+    def _expand(self, sccs: FrozenSet[int], exclude: str) -> List[str]:
+        return sorted(
+            pkg for c in sccs for pkg in self.cond.members[c] if pkg != exclude
+        )
+
+    def ancestor_count(self, pkg: str) -> int:
+        """Packages that (transitively) depend on `pkg`."""
+        return self.ancestor_sizes[self._scc(pkg)] - 1
+
+    def descendant_count(self, pkg: str) -> int:
+        """Packages `pkg` (transitively) depends on."""
+        return self.descendant_sizes[self._scc(pkg)] - 1
+
+    def ancestors(self, pkg: str) -> List[str]:
+        """Everything that breaks if `pkg` is removed."""
+        return self._expand(self._closure(pkg, upward=True), pkg)
+
+    def descendants(self, pkg: str) -> List[str]:
+        return self._expand(self._closure(pkg, upward=False), pkg)
+
+    def shared_deps(self, a: str, b: str) -> List[str]:
+        """Transitive dependencies common to `a` and `b`."""
+        common = self._closure(a, upward=False) & self._closure(b, upward=False)
+        return sorted(
+            pkg for c in common for pkg in self.cond.members[c] if pkg not in (a, b)
+        )
+
+    def query(self, kind: str, *pkgs: str) -> dict:
+        """Run one query and return a JSON-serialisable answer."""
+        start = time.perf_counter()
+        if kind == "count":
+            (pkg,) = pkgs
+            result = {
+                "ancestors": self.ancestor_count(pkg),
+                "descendants": self.descendant_count(pkg),
+            }
+        elif kind == "shared":
+            a, b = pkgs
+            packages = self.shared_deps(a, b)
+            result = {"count": len(packages), "packages": packages}
+        elif kind in ("ancestors", "descendants"):
+            (pkg,) = pkgs
+            packages = getattr(self, kind)(pkg)
+            result = {"count": len(packages), "packages": packages}
+        else:
+            raise ValueError(f"unknown query: {kind} (expected one of {', '.join(QUERIES)})")
+
+        result.update(query=kind, args=list(pkgs),
+                      elapsed_ms=round((time.perf_counter() - start) * 1000, 3))
+        return result
+
+
+def load_graph(available: bool = False) -> nx.DiGraph:
+    """Dependency graph of installed packages, or of everything apt knows about."""
+    records = stream_packages() if available else read_dpkg_status()
+    G = nx.DiGraph()
+    for pkg, deps in dependency_map(records).items():
+        G.add_node(pkg)
+        G.add_edges_from((pkg, dep) for dep in deps)
+    return G
+
+
+def answer(index: ImpactIndex, words: List[str]) -> dict:
+    try:
+        return index.query(words[0], *words[1:])
+    except (KeyError, ValueError) as e:
+        return {"error": str(e.args[0]) if e.args else str(e), "args": words}
+
+
+def repl(index: ImpactIndex) -> None:
+    print(f"Queries: {', '.join(QUERIES)} <package> [package]; empty line to quit",
+          file=sys.stderr)
+    for line in sys.stdin:
+        words = line.split()
+        if not words:
+            break
+        print(json.dumps(answer(index, words)), flush=True)
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--available", action="store_true",
+                        help="query all available packages instead of installed ones")
+    parser.add_argument("query", nargs="*", help="e.g. `ancestors libssl3`")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = ImpactIndex(load_graph(args.available))
+    print(f"Indexed {len(index.cond.scc_of)} packages in "
+          f"{len(index.cond.members)} SCCs ({time.perf_counter() - start:.2f}s)",
+          file=sys.stderr)
+
+    if not args.query:
+        repl(index)
+        return 0
+
+    result = answer(index, args.query)
+    print(json.dumps(result, indent=2))
+    return 1 if "error" in result else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
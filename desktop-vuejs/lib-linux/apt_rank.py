@@ -1,69 +1,54 @@
 #!/usr/bin/env python3
 """
-Scan apt package dependency graph using `apt-cache depends` and rank packages
-by the number of distinct packages reachable from each package (transitive closure size).
+Scan apt package dependency graph (dpkg status, or `apt-cache depends` as a
+fallback) and rank packages by the number of distinct packages reachable from
+each package (transitive closure size). Alongside the count, every package gets
+its install footprint (Installed-Size summed over the closure) and the length of
+its longest dependency chain, all from one pass over the SCC condensation.
+
+With --delta, the previous run's graph, counts and PageRank are loaded from a
+snapshot cache and only packages whose dpkg status changed since then (and the
+packages depending on them) are recomputed.
 
 Requires:
   - networkx (pip install networkx)
   - apt-cache available (Debian/Ubuntu)
 """
 
+import argparse
+import os
+import pickle
 import subprocess
 import shlex
 import sys
 import time
-import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Set, List, Optional
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Set, List, Optional, Tuple
 import networkx as nx
 import re
+from deb_control import DPKG_STATUS, dependency_map, read_dpkg_status
+from depgraph import Condensation, CSRGraph, condense, reachable_sccs
+from progress import ProgressTracker
+from rank_output import FILE_ONLY_FORMATS, FORMATS, write_rows
 
 # CONFIG
 MAX_WORKERS = 8
 INCLUDE_RECOMMENDS = False
-
-# Progress tracking
-class ProgressTracker:
-    def __init__(self, total: int, description: str = "Processing"):
-        self.total = total
-        self.current = 0
-        self.description = description
-        self.start_time = time.time()
-        self.lock = threading.Lock()
-    
-    def update(self, increment: int = 1):
-        with self.lock:
-            self.current += increment
-            self._print_progress()
-    
-    def _print_progress(self):
-        if self.total == 0:
-            return
-            
-        percent = (self.current / self.total) * 100
-        elapsed = time.time() - self.start_time
-        
-        if self.current > 0:
-            eta = (elapsed / self.current) * (self.total - self.current)
-            eta_str = f"ETA: {eta:.1f}s"
-        else:
-            eta_str = "ETA: --"
-        
-        # Create progress bar
-        bar_length = 30
-        filled = int(bar_length * self.current / self.total)
-        bar = "█" * filled + "░" * (bar_length - filled)
-        
-        rate = self.current / elapsed if elapsed > 0 else 0
-        
-        print(f"\r{self.description}: [{bar}] {self.current}/{self.total} "
-              f"({percent:5.1f}%) {rate:.1f}/s {eta_str}", end="", flush=True)
-        
-        if self.current >= self.total:
-            print()  # New line when complete
+# Packages per `apt-cache depends` invocation in the fallback path
+APT_CACHE_BATCH_SIZE = 250
+SNAPSHOT_PATH = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "apt_rank" / "snapshot.pickle"
+# Bumped whenever the snapshot layout changes; other versions are ignored
+SNAPSHOT_FORMAT = 2
+# Above this share of affected packages a full single-pass recount is cheaper
+DELTA_FULL_RECOUNT_RATIO = 0.3
 
 # Precompiled regex for version stripping
 VERSION_PATTERN = re.compile(r'^(\S+).*')
+# " |Depends: <awk>": continuation marker, relation type, target
+RELATION_LINE = re.compile(r'^\s*(\|?)([A-Za-z-]+):\s(.*)$')
 
 
 def run_cmd_with_progress(cmd: str, description: str = "") -> str:
@@ -118,91 +103,212 @@ def list_installed_packages() -> List[str]:
 
 
 def parse_apt_cache_depends_output(text: str) -> Set[str]:
-    """Optimized parsing with early filtering and regex."""
+    """
+    Dependencies from `apt-cache depends` output, one per alternative group.
+
+    Resolved like the dpkg status path (ProvidesIndex.resolve_group): a group
+    `a | b` becomes a single edge to its first alternative that is a real
+    package, else to the first provider of a `<virtual>` alternative, which
+    apt-cache lists on the further-indented lines below it:
+
+         |PreDepends: <awk>
+            mawk
+            original-awk
+
+    A group with neither falls back to its first alternative's name, as
+    dependency_map does.
+    """
     deps = set()
-    dependency_types = {"Depends:", "PreDepends:"}
+    dependency_types = {"Depends", "PreDepends"}
     if INCLUDE_RECOMMENDS:
-        dependency_types.update({"Recommends:", "Suggests:"})
-    
+        dependency_types.update({"Recommends", "Suggests"})
+
+    group: List[Tuple[str, List[str]]] = []  # (alternative, its providers)
+    in_group = False  # the previous relation line started with "|"
+    counted = False  # the previous relation line is one of dependency_types
+
+    def finish_group():
+        if not group:
+            return
+        real = next((name for name, _ in group if not name.startswith('<')), None)
+        provider = next((providers[0] for _, providers in group if providers), None)
+        deps.add(real or provider or group[0][0].strip('<>'))
+        group.clear()
+
     for line in text.splitlines():
-        line = line.strip()
-        if not line:
+        if not line.strip():
             continue
-            
-        dep_type = next((dt for dt in dependency_types if line.startswith(dt)), None)
-        if not dep_type:
-            continue
-            
-        rest = line[len(dep_type):].strip()
-        if not rest:
+        relation = RELATION_LINE.match(line)
+        if relation is None:
+            if line[0].isspace():
+                # Provider of the <virtual> alternative just above
+                if counted and group and group[-1][0].startswith('<'):
+                    group[-1][1].append(line.split()[0])
+            else:
+                # Package name heading the output
+                finish_group()
+                in_group = counted = False
             continue
-            
-        for alternative in rest.split("|"):
-            match = VERSION_PATTERN.match(alternative.strip())
-            if match:
-                pkgname = match.group(1)
-                if pkgname and not pkgname.startswith('<'):
-                    deps.add(pkgname)
-    
+
+        # " |Depends: a" marks an alternative group continued on the next line
+        continues, dep_type, rest = relation.groups()
+        if not in_group:
+            finish_group()
+        in_group = bool(continues)
+        counted = dep_type in dependency_types
+        match = VERSION_PATTERN.match(rest.strip())
+        if counted and match:
+            group.append((match.group(1), []))
+
+    finish_group()
     return deps
 
 
+def read_status() -> Optional[Tuple[Dict[str, str], Dict[str, Set[str]], Dict[str, int]]]:
+    """Installed versions, resolved dependencies and Installed-Size (KiB) from dpkg status."""
+    print(f"Reading dependencies from {DPKG_STATUS}...", end=" ", flush=True)
+    start_time = time.time()
+    versions: Dict[str, str] = {}
+    sizes: Dict[str, int] = {}
+
+    def collect(records):
+        # Take what we need as records stream past; dependency_map keeps only the groups
+        for record in records:
+            versions[record.name] = record.version
+            sizes[record.name] = record.installed_size
+            yield record
+
+    try:
+        deps = dependency_map(collect(read_dpkg_status()), include_recommends=INCLUDE_RECOMMENDS)
+    except OSError as e:
+        print(f"FAILED ({e})")
+        return None
+    print(f"OK ({time.time() - start_time:.1f}s)")
+    return versions, deps, sizes
+
+
+def get_deps_from_dpkg_status(packages: List[str],
+                              deps: Optional[Dict[str, Set[str]]] = None) -> Optional[Dict[str, Set[str]]]:
+    """Read dependencies straight from the dpkg status file; None if unavailable."""
+    if deps is None:
+        status = read_status()
+        if status is None:
+            return None
+        deps = status[1]
+
+    wanted = set(packages)
+    results = {pkg: targets for pkg, targets in deps.items() if pkg in wanted}
+    for pkg in packages:
+        results.setdefault(pkg, set())
+    return results
+
+
+def apt_cache_depends_cmd(packages: List[str]) -> List[str]:
+    """`apt-cache depends` for many packages, skipping relation types we never read."""
+    cmd = ["apt-cache", "depends", "--no-conflicts", "--no-breaks", "--no-replaces", "--no-enhances"]
+    if not INCLUDE_RECOMMENDS:
+        cmd += ["--no-recommends", "--no-suggests"]
+    return cmd + packages
+
+
+def parse_apt_cache_depends_multi(text: str) -> Dict[str, Set[str]]:
+    """
+    Split multi-package `apt-cache depends` output into per-package sections.
+
+    Each section starts with the package name in column 0, followed by indented
+    relation lines (and further-indented providers of virtual packages).
+    """
+    results: Dict[str, Set[str]] = {}
+    pkg = None
+    section: List[str] = []
+
+    for line in text.splitlines():
+        if line and not line[0].isspace():
+            if pkg is not None:
+                results[pkg] = parse_apt_cache_depends_output("\n".join(section))
+            pkg = line.strip()
+            section = []
+        elif pkg is not None:
+            section.append(line)
+
+    if pkg is not None:
+        results[pkg] = parse_apt_cache_depends_output("\n".join(section))
+    return results
+
+
 def get_deps_batch_with_progress(packages: List[str]) -> Dict[str, Set[str]]:
-    """Batch process with detailed progress tracking."""
+    """Fetch dependencies with batched `apt-cache depends` calls across a thread pool."""
     results = {}
     progress = ProgressTracker(len(packages), "Fetching dependencies")
-    
-    def fetch_single_pkg(pkg: str) -> tuple[str, Set[str]]:
+
+    def fetch_single_pkg(pkg: str) -> Dict[str, Set[str]]:
         try:
-            # Show individual command for debugging (optional)
-            # print(f"\nFetching deps for: {pkg}", file=sys.stderr)
-            
             out = subprocess.run(
-                ["apt-cache", "depends", pkg],
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE, 
+                apt_cache_depends_cmd([pkg]),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
                 timeout=30
             )
-            
             if out.returncode != 0:
-                progress.update()
-                return pkg, set()
-                
-            deps = parse_apt_cache_depends_output(out.stdout)
-            progress.update()
-            return pkg, deps
-            
-        except Exception as e:
-            progress.update()
-            return pkg, set()
-    
-    # Show batch processing details
-    print(f"Processing {len(packages)} packages with {MAX_WORKERS} workers...")
-    
+                return {pkg: set()}
+            return {pkg: parse_apt_cache_depends_output(out.stdout)}
+        except Exception:
+            return {pkg: set()}
+
+    def fetch_batch(batch: List[str]) -> Dict[str, Set[str]]:
+        try:
+            out = subprocess.run(
+                apt_cache_depends_cmd(batch),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=30 + len(batch) // 10
+            )
+            if out.returncode == 0:
+                deps = parse_apt_cache_depends_multi(out.stdout)
+                # Headers may carry an arch qualifier ("libfoo:i386") the caller did not use
+                for name in list(deps):
+                    base = name.split(":", 1)[0]
+                    if base != name and base not in deps:
+                        deps[base] = deps.pop(name)
+                return {pkg: deps.get(pkg, set()) for pkg in batch}
+        except Exception:
+            pass
+        # One bad package name can fail the whole call; retry individually
+        deps = {}
+        for pkg in batch:
+            deps.update(fetch_single_pkg(pkg))
+        return deps
+
+    batches = [packages[i:i + APT_CACHE_BATCH_SIZE]
+               for i in range(0, len(packages), APT_CACHE_BATCH_SIZE)]
+    print(f"Processing {len(packages)} packages in {len(batches)} batches "
+          f"with {MAX_WORKERS} workers...")
+
     failed_packages = []
-    
+
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(fetch_single_pkg, pkg): pkg for pkg in packages}
-        
+        futures = {executor.submit(fetch_batch, batch): batch for batch in batches}
+
         for future in as_completed(futures):
-            pkg, deps = future.result()
-            results[pkg] = deps
-            
-            if not deps and pkg in packages:  # Track failures
-                failed_packages.append(pkg)
-    
-    print()  # New line after progress bar
-    
+            batch_deps = future.result()
+            results.update(batch_deps)
+            failed_packages.extend(pkg for pkg, deps in batch_deps.items() if not deps)
+            progress.update(len(futures[future]))
+
+    progress.close()
+
     if failed_packages:
         print(f"Warning: Failed to fetch dependencies for {len(failed_packages)} packages")
         if len(failed_packages) <= 10:
             print("Failed packages:", ", ".join(failed_packages))
-    
+
     return results
 
 
-def build_graph_with_progress(packages: List[str]) -> nx.DiGraph:
+def build_graph_with_progress(packages: List[str],
+                              status_deps: Optional[Dict[str, Set[str]]] = None) -> nx.DiGraph:
     """Build graph with detailed progress tracking."""
     print("\n=== Building Dependency Graph ===")
     
@@ -210,8 +316,10 @@ def build_graph_with_progress(packages: List[str]) -> nx.DiGraph:
     print(f"Initializing graph with {len(packages)} package nodes...")
     G.add_nodes_from(packages)
     
-    # Fetch dependencies with progress
-    dep_cache = get_deps_batch_with_progress(packages)
+    # Fetch dependencies: dpkg status directly, apt-cache per package as fallback
+    dep_cache = get_deps_from_dpkg_status(packages, status_deps)
+    if dep_cache is None:
+        dep_cache = get_deps_batch_with_progress(packages)
     
     # Process edges with progress
     print("Processing dependency relationships...")
@@ -225,8 +333,8 @@ def build_graph_with_progress(packages: List[str]) -> nx.DiGraph:
             if dep not in G:
                 new_nodes.add(dep)
         edge_progress.update()
-    
-    print()  # New line after progress
+
+    edge_progress.close()
     
     if new_nodes:
         print(f"Adding {len(new_nodes)} new dependency nodes...")
@@ -239,84 +347,327 @@ def build_graph_with_progress(packages: List[str]) -> nx.DiGraph:
     return G
 
 
-def compute_reachable_counts_with_progress(G: nx.DiGraph, packages: List[str]) -> Dict[str, int]:
-    """Compute reachable counts with progress tracking."""
+@dataclass
+class Metrics:
+    counts: Dict[str, int]     # distinct packages reachable (excluding itself)
+    footprint: Dict[str, int]  # Installed-Size KiB of the package plus everything it pulls in
+    depth: Dict[str, int]      # longest dependency chain below the package
+
+
+def compute_closure_metrics(G: nx.DiGraph, packages: List[str],
+                            sizes: Optional[Dict[str, int]] = None,
+                            cond: Optional[Condensation] = None) -> Tuple[Metrics, Condensation]:
+    """
+    Reachable counts, install footprint and chain depth in one pass over the SCC
+    condensation. Returns the condensation too (built unless `cond` is given),
+    so callers can reuse its SCC ids.
+    """
     print("\n=== Computing Transitive Closures ===")
-    
-    counts = {}
-    progress = ProgressTracker(len(packages), "Computing reachability")
-    
+    start_time = time.time()
+
+    if cond is None:
+        cond = condense(G)
+    closure = cond.closure_metrics(sizes)
+    metrics = Metrics({}, {}, {})
     for pkg in packages:
-        if pkg not in G:
-            counts[pkg] = 0
+        c = cond.scc_of.get(pkg)
+        if c is None:
+            metrics.counts[pkg] = 0
+            metrics.footprint[pkg] = (sizes or {}).get(pkg, 0)
+            metrics.depth[pkg] = 0
         else:
-            try:
-                reachable = nx.descendants(G, pkg)
-                counts[pkg] = len(reachable)
-            except nx.NetworkXError:
-                counts[pkg] = 0
-        
-        progress.update()
-    
-    print()  # New line after progress
-    return counts
+            metrics.counts[pkg] = closure.sizes[c] - 1
+            metrics.footprint[pkg] = closure.weights[c]
+            metrics.depth[pkg] = closure.depth[c]
 
+    print(f"Closures for {len(cond.members)} SCCs computed in {time.time() - start_time:.1f}s")
+    return metrics, cond
 
-def main(top_n: int = 50):
-    print("=== APT Package Dependency Analyzer ===")
-    start_time = time.time()
-    
-    # Step 1: Get packages
-    packages = list_installed_packages()
-    
-    # Step 2: Build graph
-    G = build_graph_with_progress(packages)
-    
-    # Step 3: Compute metrics
-    counts = compute_reachable_counts_with_progress(G, packages)
-    
-    # Step 4: Rank and analyze
-    print("\n=== Ranking Packages ===")
-    ranked = sorted(counts.items(), key=lambda x: x[1], reverse=True)
-    
-    # Compute PageRank for top packages
-    print("Computing PageRank for top packages...")
-    top_packages = {name for name, _ in ranked[:min(top_n * 2, len(ranked))]}
-    subgraph = G.subgraph(top_packages)
-    
+
+def compute_pagerank(G: nx.DiGraph, nstart: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """PageRank over the whole graph, optionally warm-started from a previous result."""
+    if nstart is not None:
+        nstart = {pkg: nstart.get(pkg, 1.0 / max(len(G), 1)) for pkg in G}
     try:
-        pagerank = nx.pagerank(subgraph, alpha=0.85, max_iter=100)
-        print("PageRank computation complete")
-    except (nx.PowerIterationFailedToConverge, nx.NetworkXError) as e:
+        return nx.pagerank(G, alpha=0.85, max_iter=100, nstart=nstart)
+    except (nx.PowerIterationFailedConvergence, nx.NetworkXError) as e:
         print(f"PageRank failed: {e}")
-        pagerank = {pkg: 0.0 for pkg in top_packages}
-    
+        return {pkg: 0.0 for pkg in G}
+
+
+@dataclass
+class Snapshot:
+    versions: Dict[str, str]
+    deps: Dict[str, Set[str]]
+    sizes: Dict[str, int]
+    metrics: Metrics
+    pagerank: Dict[str, float]
+
+
+def load_snapshot(path: Path = SNAPSHOT_PATH) -> Optional[Snapshot]:
+    """
+    The snapshot saved by the last run, or None if missing or from another format.
+
+    The file holds only builtin containers (see save_snapshot), so it loads
+    the same whether this module runs as `apt_rank.py` or is imported by
+    `lib-linux apt-rank`.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if not isinstance(data, dict) or data.get("format") != SNAPSHOT_FORMAT:
+        return None
+    try:
+        return Snapshot(
+            versions=data["versions"],
+            deps=data["deps"],
+            sizes=data["sizes"],
+            metrics=Metrics(**data["metrics"]),
+            pagerank=data["pagerank"],
+        )
+    except (KeyError, TypeError):
+        return None
+
+
+def save_snapshot(snapshot: Snapshot, path: Path = SNAPSHOT_PATH) -> None:
+    """Write `snapshot` as plain dicts, never as pickled instances of this module's classes."""
+    data = {
+        "format": SNAPSHOT_FORMAT,
+        "versions": snapshot.versions,
+        "deps": snapshot.deps,
+        "sizes": snapshot.sizes,
+        "metrics": {
+            "counts": snapshot.metrics.counts,
+            "footprint": snapshot.metrics.footprint,
+            "depth": snapshot.metrics.depth,
+        },
+        "pagerank": snapshot.pagerank,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def diff_status(old: Snapshot, versions: Dict[str, str], deps: Dict[str, Set[str]],
+                sizes: Dict[str, int]) -> Set[str]:
+    """Packages installed, removed, upgraded or with different resolved dependencies or size."""
+    changed = set(old.versions.keys() ^ versions.keys())
+    for pkg in old.versions.keys() & versions.keys():
+        if (old.versions[pkg] != versions[pkg] or old.deps.get(pkg) != deps.get(pkg)
+                or old.sizes.get(pkg) != sizes.get(pkg)):
+            changed.add(pkg)
+    return changed
+
+
+def apply_delta(G: nx.DiGraph, changed: Set[str], versions: Dict[str, str],
+                deps: Dict[str, Set[str]]) -> None:
+    """Patch the out-edges of `changed` packages in place and drop orphaned removals."""
+    for pkg in changed:
+        if pkg in G:
+            G.remove_edges_from(list(G.out_edges(pkg)))
+        if pkg in versions:
+            G.add_node(pkg)
+            G.add_edges_from((pkg, dep) for dep in deps.get(pkg, ()))
+    for pkg in changed:
+        # Removed packages stay as nodes only while something still depends on them
+        if pkg not in versions and pkg in G and G.in_degree(pkg) == 0:
+            G.remove_node(pkg)
+
+
+def run_delta(old: Snapshot, versions: Dict[str, str], deps: Dict[str, Set[str]],
+              sizes: Dict[str, int]) -> Tuple[nx.DiGraph, Condensation, Metrics, Dict[str, float]]:
+    """Update the cached graph, closure metrics and PageRank for changed packages only."""
+    print("\n=== Applying Delta ===")
+    changed = diff_status(old, versions, deps, sizes)
+    print(f"{len(changed)} packages changed since last snapshot")
+
+    G = nx.DiGraph()
+    G.add_nodes_from(old.versions)
+    G.add_edges_from((pkg, dep) for pkg, targets in old.deps.items() for dep in targets)
+
+    # Anything that reached a changed package before the patch may have a new count
+    affected = set()
+    for pkg in changed:
+        if pkg in G:
+            affected |= nx.ancestors(G, pkg)
+    apply_delta(G, changed, versions, deps)
+
+    cond = condense(G)
+    seeds = {cond.scc_of[pkg] for pkg in changed | affected if pkg in cond.scc_of}
+    affected_sccs = set()
+    for c in seeds:
+        if c not in affected_sccs:
+            affected_sccs |= reachable_sccs(cond.pred, c)
+
+    packages = list(versions)
+    affected_pkgs = sum(len(cond.members[c]) for c in affected_sccs)
+    if affected_pkgs > DELTA_FULL_RECOUNT_RATIO * len(G):
+        print(f"{affected_pkgs} packages affected, recounting everything")
+        metrics, _ = compute_closure_metrics(G, packages, sizes, cond)
+    else:
+        print(f"Recounting {affected_pkgs} affected packages in {len(affected_sccs)} SCCs")
+        metrics = Metrics(
+            {pkg: old.metrics.counts.get(pkg, 0) for pkg in packages},
+            {pkg: old.metrics.footprint.get(pkg, sizes.get(pkg, 0)) for pkg in packages},
+            {pkg: old.metrics.depth.get(pkg, 0) for pkg in packages},
+        )
+        # Dependencies first, so affected successors already have their new depth
+        scc_depth: Dict[int, int] = {}
+        for c in reversed(cond.order):
+            if c not in affected_sccs:
+                continue
+            closure = reachable_sccs(cond.succ, c)
+            count = sum(len(cond.members[d]) for d in closure)
+            footprint = sum(sizes.get(pkg, 0) for d in closure for pkg in cond.members[d])
+            depth = max((scc_depth[d] if d in scc_depth else metrics.depth.get(cond.members[d][0], 0)
+                         for d in cond.succ[c]), default=-1) + 1
+            scc_depth[c] = depth
+            for pkg in cond.members[c]:
+                if pkg in versions:
+                    metrics.counts[pkg] = count - 1
+                    metrics.footprint[pkg] = footprint
+                    metrics.depth[pkg] = depth
+
+    print("Recomputing PageRank (warm start)...")
+    pagerank = compute_pagerank(G, nstart=old.pagerank) if changed else old.pagerank
+    return G, cond, metrics, pagerank
+
+
+def analyze(delta: bool = False) -> Tuple[nx.DiGraph, Condensation, Metrics, Dict[str, float]]:
+    """
+    Build the graph and compute closure metrics and PageRank (fully or as a
+    delta). Also returns the graph's SCC condensation.
+    """
+    status = read_status()
+    snapshot = load_snapshot() if delta and status is not None else None
+    if delta and snapshot is None:
+        print("No usable snapshot for delta mode, running full analysis")
+
+    if snapshot is not None:
+        G, cond, metrics, pagerank = run_delta(snapshot, *status)
+    else:
+        # Step 1: Get packages; the installed set from dpkg status when it was
+        # readable, so full and --delta runs rank the same packages
+        if status is not None:
+            packages = list(status[0])
+            print(f"Found {len(packages)} installed packages")
+        else:
+            packages = list_installed_packages()
+
+        # Step 2: Build graph
+        G = build_graph_with_progress(packages, status[1] if status else None)
+
+        # Step 3: Compute metrics
+        metrics, cond = compute_closure_metrics(G, packages, status[2] if status else None)
+
+        print("Computing PageRank...")
+        pagerank = compute_pagerank(G)
+
+    if status is not None:
+        versions, deps, sizes = status
+        save_snapshot(Snapshot(versions, deps, sizes, metrics, pagerank))
+
+    return G, cond, metrics, pagerank
+
+
+def iter_ranked_rows(G: nx.DiGraph, ranked: List[Tuple[str, int]], metrics: Metrics,
+                     pagerank: Dict[str, float], scc_of: Dict[str, int]) -> Iterator[Dict[str, object]]:
+    """One output row per package, in rank order, built as it is consumed."""
+    for rank, (name, cnt) in enumerate(ranked, 1):
+        in_graph = name in G
+        yield {
+            "rank": rank,
+            "package": name,
+            "reachable": cnt,
+            "footprint_kib": metrics.footprint.get(name, 0),
+            "depth": metrics.depth.get(name, 0),
+            "out_degree": G.out_degree(name) if in_graph else 0,
+            "in_degree": G.in_degree(name) if in_graph else 0,
+            "pagerank": pagerank.get(name, 0.0),
+            "scc": scc_of.get(name, -1),
+        }
+
+
+def main(top_n: int = 50, delta: bool = False, fmt: str = "table", output: str = "-",
+         export_graph: Optional[str] = None, sort_by: str = "reachable"):
+    start_time = time.time()
+
+    # Keep stdout clean for data when streaming rows to it
+    log_target = sys.stderr if fmt != "table" and output == "-" else sys.stdout
+    with redirect_stdout(log_target):
+        print("=== APT Package Dependency Analyzer ===")
+        G, cond, metrics, pagerank = analyze(delta)
+
+        if export_graph:
+            CSRGraph.from_networkx(G).save(export_graph)
+            print(f"Exported graph ({G.number_of_nodes()} nodes, {G.number_of_edges()} edges) to {export_graph}")
+
+        # Step 4: Rank and analyze
+        print("\n=== Ranking Packages ===")
+        key = {"reachable": metrics.counts, "footprint": metrics.footprint, "depth": metrics.depth}[sort_by]
+        ranked = sorted(metrics.counts.items(), key=lambda x: key.get(x[0], 0), reverse=True)
+
+        scc_of = cond.scc_of if fmt != "table" else {}
+
+    if fmt != "table":
+        written = write_rows(iter_ranked_rows(G, ranked, metrics, pagerank, scc_of), fmt, output)
+        total_time = time.time() - start_time
+        print(f"Wrote {written} packages as {fmt} to {output} (Total time: {total_time:.1f}s)",
+              file=log_target)
+        return
+
     # Results
     total_time = time.time() - start_time
     print(f"\n=== Results (Total time: {total_time:.1f}s) ===")
-    print(f"{'Package':<40} {'Reachable':<10} {'Out':<5} {'In':<5} {'PageRank':<10}")
-    print("=" * 75)
-    
+    print(f"{'Package':<40} {'Reachable':<10} {'Out':<5} {'In':<5} {'PageRank':<10} "
+          f"{'Footprint':>10} {'Depth':>5}")
+    print("=" * 93)
+
     for i, (name, cnt) in enumerate(ranked[:top_n], 1):
         pr_score = pagerank.get(name, 0.0)
         out_deg = G.out_degree(name) if name in G else 0
         in_deg = G.in_degree(name) if name in G else 0
-        print(f"{name:<40} {cnt:<10} {out_deg:<5} {in_deg:<5} {pr_score:<10.6f}")
+        footprint_mb = metrics.footprint.get(name, 0) / 1024
+        depth = metrics.depth.get(name, 0)
+        print(f"{name:<40} {cnt:<10} {out_deg:<5} {in_deg:<5} {pr_score:<10.6f} "
+              f"{footprint_mb:>8.1f}MB {depth:>5}")
 
 
-if __name__ == "__main__":
-    top_n = 30
-    if len(sys.argv) > 1:
-        try:
-            top_n = int(sys.argv[1])
-        except ValueError:
-            print(f"Warning: Invalid number '{sys.argv[1]}', using default {top_n}")
-    
+def cli(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Rank apt packages by dependency reach")
+    parser.add_argument("top_n", nargs="?", type=int, default=30, help="rows to print")
+    parser.add_argument("--delta", action="store_true",
+                        help="recompute only packages changed since the cached snapshot")
+    parser.add_argument("--format", choices=("table",) + FORMATS, default="table",
+                        help="table prints the top N; other formats write every package")
+    parser.add_argument("-o", "--output", default="-", help="output file for --format (default: stdout)")
+    parser.add_argument("--export-graph", metavar="PATH",
+                        help="also write the graph as an mmap-loadable file (see depgraph.MappedGraph)")
+    parser.add_argument("--sort", choices=("reachable", "footprint", "depth"), default="reachable",
+                        help="metric to rank by (footprint = Installed-Size of the full closure)")
+    args = parser.parse_args(argv)
+    # Fail before the analysis runs and the snapshot is saved, not after
+    if args.format in FILE_ONLY_FORMATS and args.output == "-":
+        parser.error(f"--format {args.format} needs a file path: -o FILE")
+    if args.format != "table" and args.output != "-":
+        out_dir = os.path.dirname(os.path.abspath(args.output))
+        if not os.path.isdir(out_dir) or not os.access(out_dir, os.W_OK):
+            parser.error(f"cannot write {args.output}: {out_dir} is not a writable directory")
+
     try:
-        main(top_n)
+        main(args.top_n, args.delta, args.format, args.output, args.export_graph, args.sort)
     except KeyboardInterrupt:
         print("\n\nInterrupted by user")
-        sys.exit(1)
+        return 1
     except Exception as e:
         print(f"\nError: {e}", file=sys.stderr)
-        sys.exit(1)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli(sys.argv[1:]))
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Headless benchmarks for the lib-linux dependency analyzers.
+
+Generates synthetic package graphs (power-law out-degree, a configurable number
+of dependency cycles) together with a matching synthetic `dpkg status` file,
+then times every stage of the analysis for each backend:
+
+  parse        whole-file str parse vs. streaming deb_control parse + dependency_map
+  build        networkx DiGraph / CSRGraph construction
+  rank         reachable counts: per-package nx.descendants vs. one
+               SCC-condensed bitset pass (closure_metrics, with sizes)
+  betweenness  nx.betweenness_centrality(k) vs. parallel sampled betweenness
+
+PageRank is nx.pagerank in both backends, so it is timed once per size
+(`pagerank_s`) rather than per backend.
+
+Results are printed (or written) as JSON so scaling can be tracked on CI
+machines without apt:
+  python3 bench_lib_linux.py --nodes 1000 10000 200000 -o bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import networkx as nx
+
+from deb_control import dependency_map, read_dpkg_status
+from depgraph import CSRGraph, condense
+from parallel_betweenness import sampled_betweenness
+
+BACKENDS = ("networkx", "lib-linux")
+# Per-package nx.descendants is quadratic; skip it above this many nodes
+BASELINE_REACHABILITY_LIMIT = 20000
+# Cap on a synthetic package's out-degree
+MAX_OUT_DEGREE = 200
+
+
+def synthetic_graph(nodes: int, avg_degree: float = 4.0, exponent: float = 2.1,
+                    sccs: int = 10, scc_size: int = 4, seed: int = 0) -> Dict[str, Set[str]]:
+    """
+    Random dependency map shaped like a Debian archive.
+
+    Package `i` depends only on lower-numbered packages, picked with a
+    preference for low ids, so a few base libraries collect most incoming
+    edges (power-law in-degree); out-degrees follow a Pareto distribution
+    (shape `exponent` - 1, capped at MAX_OUT_DEGREE) scaled so their mean is
+    `avg_degree`, and each package's dependencies are distinct. `sccs`
+    cycles of `scc_size` packages are then closed with back edges.
+    """
+    rng = random.Random(seed)
+    names = [f"pkg{i:06d}" for i in range(nodes)]
+    deps: Dict[str, Set[str]] = {name: set() for name in names}
+
+    # Find the factor for which sum(min(w * factor, cap)) == avg_degree * packages;
+    # the fixed point converges as the set of capped weights only grows
+    weights = [rng.paretovariate(exponent - 1) for _ in range(1, nodes)]
+    target = avg_degree * len(weights)
+    factor = target / max(sum(weights), 1e-9)
+    for _ in range(100):
+        capped = [w for w in weights if w * factor >= MAX_OUT_DEGREE]
+        free = sum(weights) - sum(capped)
+        if not free:
+            break
+        new_factor = max(target - MAX_OUT_DEGREE * len(capped), 0) / free
+        if abs(new_factor - factor) < 1e-12 * factor:
+            break
+        factor = new_factor
+
+    for i, weight in enumerate(weights, 1):
+        # Stochastic rounding keeps the mean at avg_degree despite the int()
+        degree = min(int(weight * factor + rng.random()), i, MAX_OUT_DEGREE)
+        targets = deps[names[i]]
+        if 2 * degree > i:
+            targets.update(names[j] for j in rng.sample(range(i), degree))
+            continue
+        while len(targets) < degree:
+            # Squaring a uniform draw skews targets towards the oldest packages
+            targets.add(names[int(i * rng.random() ** 2)])
+
+    for _ in range(sccs):
+        if nodes < scc_size:
+            break
+        cycle = sorted(rng.sample(range(nodes), scc_size))
+        for a, b in zip(cycle, cycle[1:] + cycle[:1]):
+            deps[names[a]].add(names[b])
+
+    return deps
+
+
+def write_status_file(deps: Dict[str, Set[str]], path: str, seed: int = 0) -> None:
+    """Write `deps` as a dpkg status file, with the noise real files carry."""
+    rng = random.Random(seed)
+    with open(path, "w") as f:
+        for pkg, targets in deps.items():
+            relations = []
+            for dep in sorted(targets):
+                roll = rng.random()
+                if roll < 0.3:
+                    relations.append(f"{dep} (>= 1.{rng.randint(0, 9)})")
+                elif roll < 0.4:
+                    # Alternative whose first choice is not installed
+                    relations.append(f"{dep}-ng | {dep}")
+                elif roll < 0.45:
+                    relations.append(f"{dep}:any")
+                else:
+                    relations.append(dep)
+            f.write(f"Package: {pkg}\n")
+            f.write("Status: install ok installed\n")
+            f.write("Priority: optional\n")
+            f.write(f"Installed-Size: {int(rng.paretovariate(1.2) * 50)}\n")
+            f.write("Architecture: amd64\n")
+            f.write(f"Version: 1.{rng.randint(0, 99)}-1\n")
+            if relations:
+                f.write(f"Depends: {', '.join(relations)}\n")
+            f.write(f"Description: synthetic package {pkg}\n")
+            f.write(" Long description line one.\n .\n Long description line two.\n\n")
+
+
+def baseline_parse_status(path: str) -> Tuple[Dict[str, Set[str]], Dict[str, int]]:
+    """
+    Dependencies and Installed-Size the straightforward way: read the whole
+    file as str, split it into paragraphs and every field, and resolve each
+    alternative group to its first installed alternative.
+    """
+    with open(path, encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    paragraphs = []
+    for block in text.split("\n\n"):
+        fields: Dict[str, str] = {}
+        key = None
+        for line in block.splitlines():
+            if line[:1] in (" ", "\t"):
+                if key is not None:
+                    fields[key] += "\n" + line
+                continue
+            key, _, value = line.partition(":")
+            fields[key] = value.strip()
+        if fields.get("Package"):
+            paragraphs.append(fields)
+
+    installed = {p["Package"] for p in paragraphs}
+    deps: Dict[str, Set[str]] = {}
+    sizes: Dict[str, int] = {}
+    for p in paragraphs:
+        targets = deps.setdefault(p["Package"], set())
+        for field in ("Pre-Depends", "Depends"):
+            for clause in p.get(field, "").split(","):
+                alternatives = [alt.split()[0].split(":")[0] for alt in clause.split("|") if alt.strip()]
+                if alternatives:
+                    targets.add(next((a for a in alternatives if a in installed), alternatives[0]))
+        sizes[p["Package"]] = int(p.get("Installed-Size", "0") or 0)
+    return deps, sizes
+
+
+def streaming_parse_status(path: str) -> Tuple[Dict[str, Set[str]], Dict[str, int]]:
+    """The lib-linux path (apt_rank.read_status): one streaming pass, no record list."""
+    sizes: Dict[str, int] = {}
+
+    def collect(records):
+        for record in records:
+            sizes[record.name] = record.installed_size
+            yield record
+
+    return dependency_map(collect(read_dpkg_status(path))), sizes
+
+
+def timed(fn: Callable, *args, **kwargs) -> Tuple[object, float]:
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def nx_reachable_counts(G: nx.DiGraph) -> Dict[str, int]:
+    return {pkg: len(nx.descendants(G, pkg)) for pkg in G}
+
+
+def bench_size(nodes: int, args: argparse.Namespace, tmpdir: str) -> Dict[str, object]:
+    deps, gen_time = timed(synthetic_graph, nodes, args.avg_degree, args.exponent,
+                           args.sccs, args.scc_size, args.seed)
+    status_path = os.path.join(tmpdir, f"status-{nodes}")
+    write_status_file(deps, status_path, args.seed)
+
+    result: Dict[str, object] = {
+        "nodes": nodes,
+        "edges": sum(len(t) for t in deps.values()),
+        "mean_out_degree": round(sum(len(t) for t in deps.values()) / max(nodes, 1), 3),
+        "status_bytes": os.path.getsize(status_path),
+        "generate_s": round(gen_time, 4),
+        "pagerank_s": None,
+        "backends": {},
+    }
+
+    (parsed_deps, sizes), _ = timed(streaming_parse_status, status_path)
+    G = nx.DiGraph()
+    G.add_nodes_from(parsed_deps)
+    G.add_edges_from((p, d) for p, t in parsed_deps.items() for d in t)
+    _, pagerank_time = timed(nx.pagerank, G)
+    result["pagerank_s"] = round(pagerank_time, 4)
+    samples = min(args.samples, nodes)
+
+    for backend in args.backends:
+        stages: Dict[str, Optional[float]] = {}
+        if backend == "networkx":
+            (backend_deps, _), stages["parse_s"] = timed(baseline_parse_status, status_path)
+            H = nx.DiGraph()
+            _, stages["build_s"] = timed(lambda: (H.add_nodes_from(backend_deps),
+                                                  H.add_edges_from((p, d) for p, t in backend_deps.items()
+                                                                   for d in t)))
+            if nodes <= BASELINE_REACHABILITY_LIMIT:
+                _, stages["rank_s"] = timed(nx_reachable_counts, H)
+            else:
+                stages["rank_s"] = None
+            _, stages["betweenness_s"] = timed(nx.betweenness_centrality, H, k=args.nx_samples,
+                                               seed=args.seed)
+            stages["betweenness_samples"] = args.nx_samples
+        else:
+            _, stages["parse_s"] = timed(streaming_parse_status, status_path)
+            _, stages["build_s"] = timed(CSRGraph.from_networkx, G)
+            cond, condense_time = timed(condense, G)
+            _, closure_time = timed(cond.closure_metrics, sizes)
+            stages["rank_s"] = condense_time + closure_time
+            _, stages["betweenness_s"] = timed(sampled_betweenness, G, k=samples,
+                                               workers=args.workers, seed=args.seed)
+            stages["betweenness_samples"] = samples
+        result["backends"][backend] = {
+            k: round(v, 4) if isinstance(v, float) else v for k, v in stages.items()
+        }
+
+    return result
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark lib-linux analyzers on synthetic graphs")
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--avg-degree", type=float, default=4.0)
+    parser.add_argument("--exponent", type=float, default=2.1, help="power-law exponent of out-degree")
+    parser.add_argument("--sccs", type=int, default=10, help="number of injected dependency cycles")
+    parser.add_argument("--scc-size", type=int, default=4)
+    parser.add_argument("--samples", type=int, default=2000, help="sampled betweenness sources")
+    parser.add_argument("--nx-samples", type=int, default=50, help="k for nx.betweenness_centrality")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {
+        "python": sys.version.split()[0],
+        "networkx": nx.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": [],
+    }
+    # Import scipy etc. before the first timed PageRank
+    nx.pagerank(nx.path_graph(3, create_using=nx.DiGraph))
+
+    with tempfile.TemporaryDirectory(prefix="bench-lib-linux-") as tmpdir:
+        for nodes in args.nodes:
+            print(f"Benchmarking {nodes} nodes...", file=sys.stderr)
+            report["results"].append(bench_size(nodes, args, tmpdir))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Startup-time regression check for the lib-linux CLI.
+
+Runs `python -X importtime lib_linux.py <args>` for commands that must stay
+cheap, sums the cumulative time of every top-level import and fails when it
+exceeds the budget or when a heavy module shows up at all:
+
+  python3 check_startup.py              # exit status 1 on regression
+  python3 check_startup.py --budget-ms 80 --verbose
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BUDGET_MS = 50.0
+# Must only be imported by the subcommand that uses them
+HEAVY_MODULES = ("networkx", "matplotlib", "numpy", "scipy", "psutil", "pyarrow")
+# Commands whose startup is measured; none of them may touch a heavy module
+CHECKED_COMMANDS = (["--help"], ["cpu", "--help"], ["ptree", "--help"])
+RUNS = 5
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CLI = os.path.join(HERE, "lib_linux.py")
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Dict[str, float]]:
+    """
+    Total top-level import time (ms) and cumulative ms per imported module.
+
+    Lines look like `import time:  self [us] | cumulative | <indent>name`;
+    nested imports are indented, so only unindented names are summed.
+    """
+    total_us = 0
+    modules: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # header line
+        cumulative = int(fields[1])
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        modules[stripped] = cumulative / 1000
+        if name[1:2] != " ":
+            total_us += cumulative
+    return total_us / 1000, modules
+
+
+def measure(args: List[str]) -> Tuple[float, Dict[str, float]]:
+    """Best of `RUNS` startups, so a cold page cache does not fail the check."""
+    best = None
+    for _ in range(RUNS):
+        proc = subprocess.run([sys.executable, "-X", "importtime", CLI] + args,
+                              capture_output=True, text=True, cwd=HERE)
+        total, modules = parse_importtime(proc.stderr)
+        if best is None or total < best[0]:
+            best = (total, modules)
+    return best
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description="Fail if lib-linux CLI startup regresses")
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--verbose", action="store_true", help="list the slowest imports")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for command in CHECKED_COMMANDS:
+        label = " ".join(command)
+        total, modules = measure(command)
+        heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+        ok = total <= args.budget_ms and not heavy
+        failed |= not ok
+        print(f"{'ok  ' if ok else 'FAIL'} lib-linux {label}: {total:.1f} ms of imports "
+              f"(budget {args.budget_ms:.0f} ms)")
+        if heavy:
+            print(f"     heavy modules imported at startup: {', '.join(heavy)}")
+        if args.verbose or not ok:
+            for name, ms in sorted(modules.items(), key=lambda x: -x[1])[:10]:
+                print(f"     {ms:8.1f} ms  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
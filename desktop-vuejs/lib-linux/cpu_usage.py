@@ -1,13 +1,17 @@
 import psutil
 import time
+from progress import ProgressTracker
 
 def collect_cpu_usage(duration, interval):
     """Collect CPU usage data for a given duration (seconds) at given intervals."""
     usage = []
     end_time = time.time() + duration
-    while time.time() < end_time:
-        usage.append(psutil.cpu_percent(interval=interval))
-        time.sleep(interval)
+    # Each sample blocks for `interval` in cpu_percent plus the sleep
+    with ProgressTracker(int(duration / (2 * interval)), "Sampling CPU") as progress:
+        while time.time() < end_time:
+            usage.append(psutil.cpu_percent(interval=interval))
+            time.sleep(interval)
+            progress.update()
     return usage
 
 def sparkline(data, width=50):
@@ -21,9 +25,9 @@ def sparkline(data, width=50):
     scaled = [int((x / max_val) * (len(chars) - 1)) for x in data]
     return "".join(chars[i] for i in scaled[:width])
 
-def main():
-    # Collect CPU usage for 30 seconds, every 1 second
-    usage = collect_cpu_usage(30, 1)
+def main(duration=30, interval=1):
+    # Collect CPU usage for 30 seconds, every 1 second by default
+    usage = collect_cpu_usage(duration, interval)
     print("CPU Usage History:")
     print(sparkline(usage))
     print(f"Average: {sum(usage) / len(usage):.1f}%")
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Streaming parser for Debian control data (`/var/lib/dpkg/status`,
+`apt-cache dumpavail`, apt Packages lists).
+
+Dependency fields are parsed into structured relations: every field is a list
+of alternative groups (`a | b`), and every alternative is a `Relation` with
+name, architecture qualifier and version constraint. `ProvidesIndex` maps
+virtual packages to the real packages providing them so groups can be
+resolved to a concrete dependency edge.
+
+Run directly to measure parse speed on a full `apt-cache dumpavail` dump:
+  python3 deb_control.py            # parse live apt-cache output
+  python3 deb_control.py FILE       # parse a saved dump / status file
+"""
+
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+DPKG_STATUS = "/var/lib/dpkg/status"
+DUMPAVAIL_CMD = ("apt-cache", "dumpavail")
+
+# Fields whose relations form hard dependency edges, in the order dpkg applies them
+DEPENDS_FIELDS = ("Pre-Depends", "Depends")
+SOFT_DEPENDS_FIELDS = ("Recommends", "Suggests")
+
+# Fields kept by default; everything else (Description, Conffiles, ...) is skipped
+DEFAULT_FIELDS = frozenset({
+    "Package", "Version", "Architecture", "Status", "Installed-Size",
+    "Provides", *DEPENDS_FIELDS, *SOFT_DEPENDS_FIELDS,
+})
+
+# name[:arch] [(op version)] [[arch list]] [<build profiles>]
+RELATION_PATTERN = re.compile(
+    r"\s*(?P<name>[^\s:(\[<]+)"
+    r"(?::(?P<arch>[^\s(\[<]+))?"
+    r"\s*(?:\(\s*(?P<op><<|<=|>=|>>|=|<|>)\s*(?P<version>[^)\s]+)\s*\))?"
+    r"\s*(?:\[[^\]]*\]\s*)?"
+    r"(?:<[^>]*>\s*)*$"
+)
+
+
+@dataclass(frozen=True)
+class Relation:
+    name: str
+    arch: Optional[str] = None
+    op: Optional[str] = None
+    version: Optional[str] = None
+
+
+# One field value, e.g. "libc6 (>= 2.34), default-mta | mail-transport-agent"
+RelationGroups = List[Tuple[Relation, ...]]
+
+
+@dataclass
+class PackageRecord:
+    name: str
+    version: str = ""
+    arch: str = ""
+    status: str = ""
+    installed_size: int = 0  # KiB, as recorded by dpkg
+    depends: RelationGroups = field(default_factory=list)
+    recommends: RelationGroups = field(default_factory=list)
+    provides: List[Relation] = field(default_factory=list)
+
+    @property
+    def installed(self) -> bool:
+        return self.status.endswith(" installed")
+
+
+@lru_cache(maxsize=65536)
+def parse_relation(text: str) -> Optional[Relation]:
+    """Parse a single alternative such as `libfoo:any (>= 1.2)`."""
+    match = RELATION_PATTERN.match(text)
+    if not match:
+        return None
+    name, arch, op, version = match.group("name", "arch", "op", "version")
+    # Legacy `<` / `>` mean `<=` / `>=` (Debian Policy 7.1)
+    if op == "<":
+        op = "<="
+    elif op == ">":
+        op = ">="
+    return Relation(name, arch, op, version)
+
+
+def parse_relations(value: str) -> RelationGroups:
+    """Parse a dependency field value into alternative groups."""
+    groups = []
+    for clause in value.split(","):
+        if not clause.strip():
+            continue
+        alternatives = tuple(
+            rel for rel in map(parse_relation, clause.split("|")) if rel is not None
+        )
+        if alternatives:
+            groups.append(alternatives)
+    return groups
+
+
+def iter_paragraphs_bytes(stream: Iterable[bytes],
+                          fields: Iterable[str] = DEFAULT_FIELDS) -> Iterator[Dict[str, str]]:
+    """
+    Yield one dict per control paragraph of a binary stream without
+    materialising the whole input.
+
+    Continuation lines are folded into the previous field. Lines are matched
+    against the wanted `Field:` prefixes with a single `bytes.startswith`
+    call, and only matching values are decoded, so the bulk of a dump
+    (descriptions, checksums, file lists) is never turned into str.
+    """
+    prefixes = tuple(f"{name}:".encode() for name in fields)
+    para: Dict[str, str] = {}
+    key = None
+
+    for line in stream:
+        if line.startswith(prefixes):
+            name, _, value = line.partition(b":")
+            key = name.decode("ascii")
+            para[key] = value.strip().decode("utf-8", "replace")
+        elif line[:1] in (b" ", b"\t"):
+            if key is not None:
+                para[key] += " " + line.strip().decode("utf-8", "replace")
+        elif not line.strip():
+            if para:
+                yield para
+                para = {}
+            key = None
+        else:
+            key = None
+
+    if para:
+        yield para
+
+
+def record_from_paragraph(para: Dict[str, str]) -> Optional[PackageRecord]:
+    """Build a `PackageRecord` from a parsed paragraph, or None if it has no Package field."""
+    name = para.get("Package")
+    if not name:
+        return None
+
+    depends: RelationGroups = []
+    for dep_field in DEPENDS_FIELDS:
+        value = para.get(dep_field)
+        if value:
+            depends.extend(parse_relations(value))
+
+    recommends: RelationGroups = []
+    for dep_field in SOFT_DEPENDS_FIELDS:
+        value = para.get(dep_field)
+        if value:
+            recommends.extend(parse_relations(value))
+
+    provides = [group[0] for group in parse_relations(para.get("Provides", ""))]
+
+    try:
+        installed_size = int(para.get("Installed-Size", "0") or 0)
+    except ValueError:
+        installed_size = 0
+
+    return PackageRecord(
+        name=name,
+        version=para.get("Version", ""),
+        arch=para.get("Architecture", ""),
+        status=para.get("Status", ""),
+        installed_size=installed_size,
+        depends=depends,
+        recommends=recommends,
+        provides=provides,
+    )
+
+
+def iter_packages_bytes(stream: Iterable[bytes]) -> Iterator[PackageRecord]:
+    """Yield `PackageRecord`s from a binary control-data stream."""
+    for para in iter_paragraphs_bytes(stream):
+        record = record_from_paragraph(para)
+        if record is not None:
+            yield record
+
+
+def read_dpkg_status(path: str = DPKG_STATUS, installed_only: bool = True) -> Iterator[PackageRecord]:
+    """Stream records from the dpkg status database."""
+    with open(path, "rb") as f:
+        for record in iter_packages_bytes(f):
+            if not installed_only or record.installed:
+                yield record
+
+
+def stream_packages(cmd: Sequence[str] = DUMPAVAIL_CMD) -> Iterator[PackageRecord]:
+    """
+    Run `cmd` (by default `apt-cache dumpavail`) and yield records as its
+    output arrives, reading the pipe in small buffered chunks instead of
+    capturing the whole dump. Raises `subprocess.CalledProcessError` on failure.
+    """
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as proc:
+        try:
+            yield from iter_packages_bytes(proc.stdout)
+        finally:
+            # Closing early (consumer stopped) must not leave apt-cache blocked on a full pipe
+            proc.stdout.close()
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+
+class ProvidesIndex:
+    """Resolve dependency alternatives against real and virtual packages."""
+
+    def __init__(self, records: Iterable[PackageRecord] = ()):
+        self.real: Set[str] = set()
+        self.providers: Dict[str, List[str]] = defaultdict(list)
+        for record in records:
+            self.add(record)
+
+    def add(self, record: PackageRecord) -> None:
+        self.real.add(record.name)
+        for rel in record.provides:
+            providers = self.providers[rel.name]
+            if record.name not in providers:
+                providers.append(record.name)
+
+    def resolve_group(self, group: Tuple[Relation, ...]) -> Optional[str]:
+        """
+        Pick the package an alternative group depends on: the first alternative
+        that is a real package, else the first provider of a virtual one.
+        """
+        for rel in group:
+            if rel.name in self.real:
+                return rel.name
+        for rel in group:
+            providers = self.providers.get(rel.name)
+            if providers:
+                return providers[0]
+        return None
+
+
+def dependency_map(records: Iterable[PackageRecord],
+                   include_recommends: bool = False) -> Dict[str, Set[str]]:
+    """
+    Resolve every record's dependency groups to concrete package names.
+
+    Returns {package: {dependency, ...}}; unsatisfiable groups fall back to the
+    first alternative's name so missing dependencies still show up as nodes.
+
+    `records` is consumed in a single pass that keeps only each package's
+    name and dependency groups (the relations themselves are shared through
+    parse_relation's cache) while the Provides index is built, so a stream
+    from read_dpkg_status / stream_packages is never held as full records.
+    """
+    index = ProvidesIndex()
+    pending: List[Tuple[str, RelationGroups]] = []
+    for record in records:
+        index.add(record)
+        groups = record.depends + record.recommends if include_recommends else record.depends
+        pending.append((record.name, groups))
+
+    deps: Dict[str, Set[str]] = {}
+    for name, groups in pending:
+        targets = deps.setdefault(name, set())
+        for group in groups:
+            target = index.resolve_group(group) or group[0].name
+            if target != name:
+                targets.add(target)
+
+    return deps
+
+
+def main(argv: List[str]) -> None:
+    start = time.perf_counter()
+    if argv:
+        source = argv[0]
+        with open(source, "rb") as f:
+            records = list(iter_packages_bytes(f))
+    else:
+        source = " ".join(DUMPAVAIL_CMD)
+        records = list(stream_packages())
+    parsed = time.perf_counter()
+
+    deps = dependency_map(records)
+    resolved = time.perf_counter()
+
+    relations = sum(len(r.depends) for r in records)
+    edges = sum(len(d) for d in deps.values())
+    parse_time = parsed - start
+    print(f"Source: {source}")
+    print(f"Parsed {len(records)} packages, {relations} dependency groups "
+          f"in {parse_time:.2f}s ({len(records) / max(parse_time, 1e-9):.0f} pkg/s)")
+    print(f"Resolved {edges} edges in {resolved - parsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
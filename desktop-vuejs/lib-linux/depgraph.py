@@ -0,0 +1,319 @@
+"""
+Compact representations of a package dependency graph.
+
+`CSRGraph` is the compressed sparse row form: node names are interned to dense
+integer ids; out-edges of node `i` are `targets[offsets[i]:offsets[i + 1]]`.
+The two integer arrays can be copied into a `multiprocessing.shared_memory`
+block so worker processes read the same graph without pickling it.
+
+`CSRGraph.save` writes the same arrays plus the name table to one versioned
+binary file; `MappedGraph` opens it with `mmap` and exposes zero-copy
+`memoryview` (or NumPy) views, so the OS page cache is shared by every process
+that loads the graph.
+
+`Condensation` is the DAG of strongly connected components, with closure
+sizes computed in one topological pass using integer bitsets.
+"""
+
+import mmap
+import struct
+import sys
+from array import array
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import networkx as nx
+
+# Shared memory layout: header (n, m) as int64, offsets int64[n + 1], targets int32[m]
+_HEADER = array("q", [0, 0]).itemsize * 2
+
+# Graph file layout (little-endian), every section 8-byte aligned:
+#   header: magic, version, flags, n, m, len(names blob)
+#   offsets int64[n + 1] | targets int32[m] | name_offsets int64[n + 1] | names utf-8
+GRAPH_MAGIC = b"DEPGRAPH"
+GRAPH_VERSION = 1
+_FILE_HEADER = struct.Struct("<8sIIQQQ")
+
+
+def _pad8(size: int) -> int:
+    return -size % 8
+
+
+def _le_bytes(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+@dataclass
+class CSRGraph:
+    names: List[str]
+    offsets: array  # 'q', len(names) + 1
+    targets: array  # 'i', number of edges
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.names)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    def index(self) -> Dict[str, int]:
+        return {name: i for i, name in enumerate(self.names)}
+
+    def successors(self, node: int) -> array:
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    @classmethod
+    def from_edges(cls, nodes: Iterable[str], edges: Iterable[Tuple[str, str]]) -> "CSRGraph":
+        names = list(dict.fromkeys(nodes))
+        ids = {name: i for i, name in enumerate(names)}
+        adjacency: List[List[int]] = [[] for _ in names]
+
+        for src, dst in edges:
+            for name in (src, dst):
+                if name not in ids:
+                    ids[name] = len(names)
+                    names.append(name)
+                    adjacency.append([])
+            adjacency[ids[src]].append(ids[dst])
+
+        offsets = array("q", [0])
+        targets = array("i")
+        for succ in adjacency:
+            targets.extend(sorted(set(succ)))
+            offsets.append(len(targets))
+        return cls(names, offsets, targets)
+
+    @classmethod
+    def from_networkx(cls, G: nx.DiGraph) -> "CSRGraph":
+        return cls.from_edges(G.nodes, G.edges)
+
+    def to_shared_memory(self) -> shared_memory.SharedMemory:
+        """Copy offsets/targets into a new shared memory block (caller unlinks it)."""
+        n, m = self.num_nodes, self.num_edges
+        size = _HEADER + self.offsets.itemsize * (n + 1) + self.targets.itemsize * m
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        buf = shm.buf
+        buf[:_HEADER] = array("q", [n, m]).tobytes()
+        start = _HEADER
+        end = start + self.offsets.itemsize * (n + 1)
+        buf[start:end] = self.offsets.tobytes()
+        buf[end:end + self.targets.itemsize * m] = self.targets.tobytes()
+        return shm
+
+    def save(self, path: str) -> None:
+        """Write the graph as a single versioned file readable by `MappedGraph`."""
+        encoded = [name.encode("utf-8") for name in self.names]
+        name_offsets = array("q", [0])
+        for name in encoded:
+            name_offsets.append(name_offsets[-1] + len(name))
+        names_blob = b"".join(encoded)
+
+        targets = _le_bytes(self.targets)
+        with open(path, "wb") as f:
+            f.write(_FILE_HEADER.pack(GRAPH_MAGIC, GRAPH_VERSION, 0,
+                                      self.num_nodes, self.num_edges, len(names_blob)))
+            f.write(_le_bytes(self.offsets))
+            f.write(targets)
+            f.write(b"\0" * _pad8(len(targets)))
+            f.write(_le_bytes(name_offsets))
+            f.write(names_blob)
+
+
+class MappedGraph:
+    """
+    Read-only CSR graph backed by an `mmap` of a file written by `CSRGraph.save`.
+
+    Opening only parses the fixed-size header; `offsets`, `targets` and the name
+    table are views into the mapping and are paged in on first access.
+    """
+
+    def __init__(self, path: str):
+        if sys.byteorder != "little":
+            raise RuntimeError("MappedGraph views require a little-endian host")
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mmap)
+
+        if len(buf) < _FILE_HEADER.size:
+            raise ValueError(f"{path}: truncated graph file")
+        magic, version, _flags, n, m, names_len = _FILE_HEADER.unpack_from(buf)
+        if magic != GRAPH_MAGIC:
+            raise ValueError(f"{path}: not a dependency graph file")
+        if version != GRAPH_VERSION:
+            raise ValueError(f"{path}: unsupported graph file version {version}")
+
+        pos = _FILE_HEADER.size
+        sections = []
+        for count, itemsize in ((n + 1, 8), (m, 4), (n + 1, 8)):
+            size = count * itemsize
+            sections.append((pos, pos + size))
+            pos += size + _pad8(size)
+        if len(buf) < pos + names_len:
+            raise ValueError(f"{path}: truncated graph file")
+
+        (o0, o1), (t0, t1), (n0, n1) = sections
+        self.num_nodes = n
+        self.num_edges = m
+        self.offsets = buf[o0:o1].cast("q")
+        self.targets = buf[t0:t1].cast("i")
+        self.name_offsets = buf[n0:n1].cast("q")
+        self.names_blob = buf[pos:pos + names_len]
+        self._index: Optional[Dict[str, int]] = None
+
+    def name(self, node: int) -> str:
+        return str(self.names_blob[self.name_offsets[node]:self.name_offsets[node + 1]], "utf-8")
+
+    @property
+    def names(self) -> List[str]:
+        return [self.name(i) for i in range(self.num_nodes)]
+
+    def index(self) -> Dict[str, int]:
+        """Name -> node id, built on first use."""
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.names)}
+        return self._index
+
+    def successors(self, node: int) -> memoryview:
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def numpy(self):
+        """(offsets, targets) as zero-copy read-only NumPy arrays."""
+        import numpy as np
+        return (np.frombuffer(self.offsets, dtype="<i8"),
+                np.frombuffer(self.targets, dtype="<i4"))
+
+    def close(self) -> None:
+        # Views (and NumPy arrays from numpy()) must be gone before the mapping can close
+        for view in (self.offsets, self.targets, self.name_offsets, self.names_blob):
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "MappedGraph":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def attach_shared_csr(buf: memoryview) -> Tuple[memoryview, memoryview]:
+    """Zero-copy (offsets, targets) views over a block written by `to_shared_memory`."""
+    n, m = buf[:_HEADER].cast("q")
+    start = _HEADER
+    end = start + 8 * (n + 1)
+    offsets = buf[start:end].cast("q")
+    targets = buf[end:end + 4 * m].cast("i")
+    return offsets, targets
+
+
+@dataclass
+class Condensation:
+    scc_of: Dict[str, int]      # package -> SCC id
+    members: List[List[str]]    # SCC id -> packages
+    succ: List[List[int]]       # SCC id -> SCCs it depends on
+    pred: List[List[int]]       # SCC id -> SCCs depending on it
+    order: List[int]            # topological order, dependents before dependencies
+
+    def closure_sizes(self, upward: bool = False) -> List[int]:
+        """Number of packages reachable from each SCC, its own members included."""
+        return self.closure_metrics(upward=upward).sizes
+
+    def closure_metrics(self, weights: Optional[Dict[str, int]] = None,
+                        upward: bool = False) -> "ClosureMetrics":
+        """
+        Closure size, summed weight and chain depth for every SCC in one pass.
+
+        SCCs are visited in reverse topological order: every SCC owns a
+        contiguous bit range and its closure is the OR of its own bits and its
+        neighbours' closures. A closure is dropped as soon as the last SCC
+        needing it is done, so only the current frontier is resident.
+
+        Weights (e.g. Installed-Size) are summed without enumerating members:
+        for each binary digit `b` of the weights there is a mask of the packages
+        whose weight has that digit set, and the closure's total weight is
+        sum(popcount(closure & mask_b) << b). `upward=True` follows reverse
+        edges (dependents) instead of dependencies.
+        """
+        n = len(self.members)
+        inner, outer = (self.pred, self.succ) if upward else (self.succ, self.pred)
+        order = self.order if upward else self.order[::-1]
+
+        # Bit offsets assigned in processing order keep early (widely shared) closures narrow
+        start = [0] * n
+        pos = 0
+        for c in order:
+            start[c] = pos
+            pos += len(self.members[c])
+
+        masks: List[int] = []
+        if weights:
+            digits = max(weights.values(), default=0).bit_length()
+            # Set bits in byte buffers and convert each plane once; OR-ing
+            # into a growing int per package would be quadratic
+            planes = [bytearray((pos + 7) // 8) for _ in range(digits)]
+            for c in range(n):
+                for i, pkg in enumerate(self.members[c]):
+                    w = weights.get(pkg, 0)
+                    if not w:
+                        continue
+                    bit = start[c] + i
+                    byte, flag = bit >> 3, 1 << (bit & 7)
+                    for b in range(w.bit_length()):
+                        if w >> b & 1:
+                            planes[b][byte] |= flag
+            masks = [int.from_bytes(plane, "little") for plane in planes]
+
+        pending = [len(outer[c]) for c in range(n)]
+        bits: Dict[int, int] = {}
+        sizes = [0] * n
+        totals = [0] * n
+        depth = [0] * n
+        for c in order:
+            closure = ((1 << len(self.members[c])) - 1) << start[c]
+            longest = -1
+            for d in inner[c]:
+                closure |= bits[d]
+                longest = max(longest, depth[d])
+                pending[d] -= 1
+                if pending[d] == 0:
+                    del bits[d]
+            sizes[c] = closure.bit_count()
+            totals[c] = sum((closure & mask).bit_count() << b for b, mask in enumerate(masks))
+            depth[c] = longest + 1
+            if pending[c]:
+                bits[c] = closure
+        return ClosureMetrics(sizes, totals, depth)
+
+
+@dataclass
+class ClosureMetrics:
+    sizes: List[int]    # packages in the closure, own SCC included
+    weights: List[int]  # summed weight over the same packages
+    depth: List[int]    # longest chain of SCC-to-SCC edges below (or above) the SCC
+
+
+def condense(G: nx.DiGraph) -> Condensation:
+    """Collapse dependency cycles of `G` into a DAG of strongly connected components."""
+    C = nx.condensation(G)
+    scc_of = C.graph["mapping"]
+    n = C.number_of_nodes()
+    members = [sorted(C.nodes[c]["members"]) for c in range(n)]
+    succ = [list(C.successors(c)) for c in range(n)]
+    pred = [list(C.predecessors(c)) for c in range(n)]
+    return Condensation(scc_of, members, succ, pred, list(nx.topological_sort(C)))
+
+
+def reachable_sccs(adjacency: List[List[int]], start: int) -> Set[int]:
+    """SCC ids reachable from `start` along `adjacency`, `start` included."""
+    seen = {start}
+    stack = [start]
+    while stack:
+        for d in adjacency[stack.pop()]:
+            if d not in seen:
+                seen.add(d)
+                stack.append(d)
+    return seen
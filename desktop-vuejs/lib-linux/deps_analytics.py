@@ -1,50 +1,35 @@
 # dep_ranker.py
-import re
-import subprocess
-from collections import defaultdict
 import networkx as nx
-import matplotlib.pyplot as plt
+from deb_control import dependency_map, stream_packages
+from parallel_betweenness import sampled_betweenness
+from progress import track
+
+# Sampled sources for approximate betweenness; higher is more accurate
+BETWEENNESS_SAMPLES = 2000
 
 def fetch_dependencies():
     """Parse local apt cache to get package dependencies"""
-    cmd = ["apt-cache", "dumpavail"]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    
-    packages = defaultdict(list)
-    current_pkg = None
-
-    for line in result.stdout.splitlines():
-        pkg_match = re.match(r"^Package: (.+)", line)
-        dep_match = re.match(r"^Depends: (.+)", line)
-        
-        if pkg_match:
-            current_pkg = pkg_match.group(1)
-        if dep_match and current_pkg:
-            # Simple split; real parsing should handle version constraints, ORs, etc.
-            deps = dep_match.group(1).split(",")
-            for dep in deps:
-                dep_name = dep.strip().split()[0]  # ignore version
-                packages[current_pkg].append(dep_name)
-    
-    return packages
+    # Streamed from `apt-cache dumpavail`; Pre-Depends + Depends, alternatives
+    # and virtual packages resolved via Provides
+    return dependency_map(track(stream_packages(), "Parsing dumpavail"))
 
 def build_graph(packages):
     """Create a directed graph from package dependencies"""
     G = nx.DiGraph()
-    for pkg, deps in packages.items():
+    for pkg, deps in track(packages.items(), "Building graph", len(packages)):
         G.add_node(pkg)
         for dep in deps:
             G.add_edge(pkg, dep)  # pkg -> depends on -> dep
     return G
 
-def rank_packages(G):
+def rank_packages(G, samples=BETWEENNESS_SAMPLES):
     """Rank packages using various centrality measures"""
     # In-degree: how many depend on this package (popularity)
     in_degree = nx.in_degree_centrality(G)
     
     # Betweenness: how critical it is in the graph
     try:
-        betweenness = nx.betweenness_centrality(G, k=50)  # approx for speed
+        betweenness = sampled_betweenness(G, k=samples)  # approx, parallel over sources
     except nx.NetworkXError:
         betweenness = {}
 
@@ -60,6 +45,11 @@ def rank_packages(G):
     for pkg, score in sorted(pagerank.items(), key=lambda x: -x[1])[:10]:
         print(f"  {pkg}: {score:.6f}")
 
+    if betweenness:
+        print("\nTop 10 by Betweenness (most critical bridges):")
+        for pkg, score in sorted(betweenness.items(), key=lambda x: -x[1])[:10]:
+            print(f"  {pkg}: {score:.6f}")
+
 def main():
     print("Fetching package dependencies...")
     packages = fetch_dependencies()
@@ -71,7 +61,8 @@ def main():
     print("Ranking packages...")
     rank_packages(G)
 
-    # Optional: Draw a small subgraph
+    # Optional: Draw a small subgraph (needs matplotlib)
+    # import matplotlib.pyplot as plt
     # nx.draw(G.subgraph(list(G.nodes())[:30]), with_labels=True, node_size=50, font_size=8)
     # plt.show()
 
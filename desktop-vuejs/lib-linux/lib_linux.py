@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the lib-linux tools.
+
+  lib-linux apt-rank [top_n] [--delta] [--format ...]   rank packages by reach
+  lib-linux query [ancestors|descendants|shared|count] PKG...
+  lib-linux deps                                        centrality over dumpavail
+  lib-linux cpu [--duration S] [--interval S]           CPU usage sparkline
+  lib-linux net                                         active connections
+  lib-linux ptree                                       process tree
+
+Only argparse is imported up front; each subcommand imports its module (and
+with it networkx or psutil) when it runs, so `lib-linux --help` or `lib-linux
+cpu` never pays for networkx. check_startup.py keeps it that way.
+"""
+
+import argparse
+import sys
+from typing import List
+
+
+def run_apt_rank(argv: List[str]) -> int:
+    import apt_rank
+    return apt_rank.cli(argv)
+
+
+def run_query(argv: List[str]) -> int:
+    import apt_query
+    return apt_query.main(argv)
+
+
+# Subcommands that own their argument parsing; everything after the name is theirs
+PASSTHROUGH = {"apt-rank": run_apt_rank, "query": run_query}
+
+
+def run_deps(args: argparse.Namespace) -> int:
+    import deps_analytics
+    deps_analytics.main()
+    return 0
+
+
+def run_cpu(args: argparse.Namespace) -> int:
+    import cpu_usage
+    cpu_usage.main(args.duration, args.interval)
+    return 0
+
+
+def run_net(args: argparse.Namespace) -> int:
+    import net_watch
+    net_watch.main()
+    return 0
+
+
+def run_ptree(args: argparse.Namespace) -> int:
+    import sys_process_tree
+    sys_process_tree.main()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="lib-linux", description="Linux system and package tools")
+    sub = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    # Listed for --help only; main() dispatches PASSTHROUGH commands before parsing
+    sub.add_parser("apt-rank", help="rank apt packages by dependency reach")
+    sub.add_parser("query", help="impact queries over the dependency graph")
+
+    p = sub.add_parser("deps", help="in-degree, PageRank and betweenness over apt-cache dumpavail")
+    p.set_defaults(func=run_deps)
+
+    p = sub.add_parser("cpu", help="sample CPU usage and print a sparkline")
+    p.add_argument("--duration", type=float, default=30, help="seconds to sample (default: 30)")
+    p.add_argument("--interval", type=float, default=1, help="seconds per sample (default: 1)")
+    p.set_defaults(func=run_cpu)
+
+    p = sub.add_parser("net", help="list active inet connections")
+    p.set_defaults(func=run_net)
+
+    p = sub.add_parser("ptree", help="print the process tree")
+    p.set_defaults(func=run_ptree)
+
+    return parser
+
+
+def main(argv: List[str]) -> int:
+    if argv and argv[0] in PASSTHROUGH:
+        command, run = argv[0], lambda: PASSTHROUGH[argv[0]](argv[1:])
+    else:
+        args = build_parser().parse_args(argv)
+        command, run = args.command, lambda: args.func(args)
+    try:
+        return run()
+    except ModuleNotFoundError as e:
+        print(f"lib-linux {command}: missing dependency: {e.name} (pip install {e.name})",
+              file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
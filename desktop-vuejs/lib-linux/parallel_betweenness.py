@@ -0,0 +1,121 @@
+"""
+Approximate betweenness centrality by sampling source nodes (Brandes, 2001)
+split across a process pool.
+
+The graph is shared read-only as CSR arrays in shared memory; every worker runs
+single-source shortest-path accumulation for its slice of sampled sources and
+returns sparse partial sums which are merged in the parent. Each source only
+touches the nodes it can reach, so a sample costs the size of its dependency
+closure rather than the whole graph as in `nx.betweenness_centrality`.
+Accuracy is controlled by the number of sampled sources `k`.
+"""
+
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+import networkx as nx
+
+from depgraph import CSRGraph, attach_shared_csr
+
+# Worker-process state, set once by _init_worker
+_shm: Optional[shared_memory.SharedMemory] = None
+_offsets = None
+_targets = None
+
+
+def _init_worker(shm_name: str) -> None:
+    global _shm, _offsets, _targets
+    _shm = shared_memory.SharedMemory(name=shm_name, track=False)
+    _offsets, _targets = attach_shared_csr(_shm.buf)
+
+
+def _accumulate(sources: List[int], offsets, targets) -> Dict[int, float]:
+    """Brandes dependency accumulation for `sources` on an unweighted CSR graph."""
+    partial: Dict[int, float] = {}
+
+    for s in sources:
+        order = [s]
+        preds: Dict[int, List[int]] = {s: []}
+        sigma = {s: 1.0}
+        dist = {s: 0}
+
+        # BFS, recording shortest-path counts and predecessors
+        i = 0
+        while i < len(order):
+            v = order[i]
+            i += 1
+            dv = dist[v] + 1
+            sv = sigma[v]
+            for j in range(offsets[v], offsets[v + 1]):
+                w = targets[j]
+                dw = dist.get(w)
+                if dw is None:
+                    dist[w] = dv
+                    sigma[w] = sv
+                    preds[w] = [v]
+                    order.append(w)
+                elif dw == dv:
+                    sigma[w] += sv
+                    preds[w].append(v)
+
+        # Back-propagate dependencies in order of non-increasing distance
+        delta = dict.fromkeys(order, 0.0)
+        for w in reversed(order):
+            coeff = (1.0 + delta[w]) / sigma[w]
+            for v in preds[w]:
+                delta[v] += sigma[v] * coeff
+            if w != s:
+                partial[w] = partial.get(w, 0.0) + delta[w]
+
+    return partial
+
+
+def _worker(sources: List[int]) -> Dict[int, float]:
+    return _accumulate(sources, _offsets, _targets)
+
+
+def sampled_betweenness(G: nx.DiGraph, k: int = 2000, workers: Optional[int] = None,
+                        seed: Optional[int] = None, normalized: bool = True) -> Dict[str, float]:
+    """
+    Estimate betweenness centrality from `k` sampled sources.
+
+    Scaling matches `nx.betweenness_centrality(G, k=k, normalized=normalized)`
+    for directed graphs, so the result is a drop-in replacement.
+    """
+    csr = CSRGraph.from_networkx(G)
+    n = csr.num_nodes
+    if n == 0:
+        return {}
+
+    k = min(k, n)
+    sources = random.Random(seed).sample(range(n), k)
+    workers = workers or os.cpu_count() or 1
+
+    totals = [0.0] * n
+    if workers == 1 or k < 64:
+        for node, value in _accumulate(sources, csr.offsets, csr.targets).items():
+            totals[node] += value
+    else:
+        # Several chunks per worker keeps the pool busy when closure sizes are skewed
+        chunk_count = min(k, workers * 4)
+        chunks = [sources[i::chunk_count] for i in range(chunk_count)]
+        shm = csr.to_shared_memory()
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(shm.name,)) as pool:
+                for partial in pool.map(_worker, chunks):
+                    for node, value in partial.items():
+                        totals[node] += value
+        finally:
+            shm.close()
+            shm.unlink()
+
+    scale = 1.0
+    if normalized and n > 2:
+        scale = 1.0 / ((n - 1) * (n - 2))
+    scale *= n / k
+
+    return {name: totals[i] * scale for i, name in enumerate(csr.names)}
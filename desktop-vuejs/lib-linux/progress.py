@@ -0,0 +1,103 @@
+"""
+Low-overhead terminal progress bar shared by the lib-linux scripts.
+
+`update()` only bumps a counter owned by the calling thread; the bar is
+redrawn at most `MAX_REDRAW_HZ` times per second by whichever thread notices
+the deadline has passed, summing all per-thread counters at that moment.
+When stdout is not a TTY (pipes, cron, CI logs) nothing is printed at all.
+"""
+
+import sys
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional, TextIO, TypeVar
+
+MAX_REDRAW_HZ = 10
+BAR_LENGTH = 30
+
+T = TypeVar("T")
+
+
+class ProgressTracker:
+    def __init__(self, total: int, description: str = "Processing",
+                 stream: Optional[TextIO] = None):
+        self.total = total
+        self.description = description
+        self.stream = stream or sys.stdout
+        self.enabled = self.stream.isatty()
+        self.start_time = time.monotonic()
+        self._interval = 1.0 / MAX_REDRAW_HZ
+        self._next_draw = self.start_time
+        self._local = threading.local()
+        self._counters: List[List[int]] = []
+        self._register_lock = threading.Lock()
+        self._draw_lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def current(self) -> int:
+        return sum(counter[0] for counter in self._counters)
+
+    def _counter(self) -> List[int]:
+        counter = getattr(self._local, "counter", None)
+        if counter is None:
+            counter = self._local.counter = [0]
+            with self._register_lock:
+                self._counters.append(counter)
+        return counter
+
+    def update(self, increment: int = 1):
+        self._counter()[0] += increment
+        if self.enabled and time.monotonic() >= self._next_draw:
+            # Another thread already drawing is as good as drawing ourselves
+            if self._draw_lock.acquire(blocking=False):
+                try:
+                    self._next_draw = time.monotonic() + self._interval
+                    self._print_progress()
+                finally:
+                    self._draw_lock.release()
+
+    def close(self):
+        """Draw the final state and end the line."""
+        if self._closed:
+            return
+        self._closed = True
+        if self.enabled:
+            with self._draw_lock:
+                self._print_progress()
+                print(file=self.stream, flush=True)
+
+    def __enter__(self) -> "ProgressTracker":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _print_progress(self):
+        current = self.current
+        elapsed = time.monotonic() - self.start_time
+        rate = current / elapsed if elapsed > 0 else 0
+
+        if self.total <= 0:
+            line = f"{self.description}: {current} ({rate:.1f}/s)"
+        else:
+            percent = min(current / self.total, 1.0)
+            if current > 0:
+                eta = (elapsed / current) * max(self.total - current, 0)
+                eta_str = f"ETA: {eta:.1f}s"
+            else:
+                eta_str = "ETA: --"
+            filled = int(BAR_LENGTH * percent)
+            bar = "█" * filled + "░" * (BAR_LENGTH - filled)
+            line = (f"{self.description}: [{bar}] {current}/{self.total} "
+                    f"({percent * 100:5.1f}%) {rate:.1f}/s {eta_str}")
+
+        print(f"\r{line}", end="", file=self.stream, flush=True)
+
+
+def track(iterable: Iterable[T], description: str = "Processing", total: int = 0) -> Iterator[T]:
+    """Yield from `iterable`, counting items on a `ProgressTracker` (total 0 = unknown)."""
+    with ProgressTracker(total, description) as progress:
+        for item in iterable:
+            yield item
+            progress.update()
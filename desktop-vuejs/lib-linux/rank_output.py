@@ -0,0 +1,104 @@
+"""
+Machine-readable writers for apt_rank results.
+
+Rows arrive as an iterator in rank order and are written as they come, so
+the full table never has to be materialised: JSON lines and CSV write one
+row at a time, Parquet (only when pyarrow is installed) buffers one row group.
+"""
+
+import csv
+import json
+import sys
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, TextIO
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+FIELDS = ("rank", "package", "reachable", "footprint_kib", "depth",
+          "out_degree", "in_degree", "pagerank", "scc")
+# Parquet is offered only when pyarrow imports
+FORMATS = ("jsonl", "csv") + (("parquet",) if pa is not None else ())
+# Formats written to a file path only, never to stdout
+FILE_ONLY_FORMATS = ("parquet",)
+PARQUET_ROW_GROUP = 65536
+
+Row = Dict[str, object]
+
+
+@contextmanager
+def _open_text(path: str) -> Iterator[TextIO]:
+    if path == "-":
+        yield sys.stdout
+        sys.stdout.flush()
+    else:
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            yield f
+
+
+def write_jsonl(rows: Iterable[Row], path: str) -> int:
+    count = 0
+    with _open_text(path) as f:
+        for row in rows:
+            f.write(json.dumps(row))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def write_csv(rows: Iterable[Row], path: str) -> int:
+    count = 0
+    with _open_text(path) as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def write_parquet(rows: Iterable[Row], path: str) -> int:
+    if pa is None:
+        raise RuntimeError("parquet output requires pyarrow (pip install pyarrow)")
+    if path == "-":
+        raise RuntimeError("parquet output needs a file path, not stdout")
+
+    schema = pa.schema([
+        ("rank", pa.int32()), ("package", pa.string()), ("reachable", pa.int32()),
+        ("footprint_kib", pa.int64()), ("depth", pa.int32()),
+        ("out_degree", pa.int32()), ("in_degree", pa.int32()),
+        ("pagerank", pa.float64()), ("scc", pa.int32()),
+    ])
+    count = 0
+    batch = {name: [] for name in FIELDS}
+
+    with pq.ParquetWriter(path, schema) as writer:
+        def flush():
+            writer.write_batch(pa.record_batch([batch[name] for name in FIELDS], schema=schema))
+            for column in batch.values():
+                column.clear()
+
+        for row in rows:
+            for name in FIELDS:
+                batch[name].append(row[name])
+            count += 1
+            if count % PARQUET_ROW_GROUP == 0:
+                flush()
+        if batch["rank"]:
+            flush()
+    return count
+
+
+WRITERS = {"jsonl": write_jsonl, "csv": write_csv, "parquet": write_parquet}
+
+
+def write_rows(rows: Iterable[Row], fmt: str, path: str) -> int:
+    """Write rows in `fmt` to `path` ("-" for stdout); returns the number written."""
+    try:
+        writer = WRITERS[fmt]
+    except KeyError:
+        raise ValueError(f"unknown output format: {fmt} (expected one of {', '.join(FORMATS)})") from None
+    return writer(rows, path)
@@ -1,8 +1,8 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
-# Check args
-[[ $# -eq 1 && -f "$1" && "${1##*.}" == "py" ]] || { echo "Usage: $0 file.py"; exit 1; }
+# Check args (anything after file.py is passed to pyinstaller, e.g. --add-data)
+[[ $# -ge 1 && -f "$1" && "${1##*.}" == "py" ]] || { echo "Usage: $0 file.py [pyinstaller args...]"; exit 1; }
 
 TARGET="$(realpath "$1")"
 DIR="$(dirname "$TARGET")" 
@@ -36,6 +36,7 @@ echo "Building $NAME..."
     --workpath "/tmp/build_$$" \
     --specpath "/tmp/build_$$" \
     --hidden-import pkg_resources \
+    "${@:2}" \
     "$TARGET"
 
 # Cleanup